@@ -1,6 +1,8 @@
 import os
 from typing import Any
 
+import orjson
+
 from config.default_config import DEFAULT_CONFIG
 
 
@@ -53,6 +55,11 @@ def _get_bool_env(key: str) -> bool:
     return value.lower() == "true" if value is not None else False
 
 
+def _json_serializer(obj: Any) -> str:
+    """使用orjson序列化数据库JSON/JSONB字段，兼容非字符串类型的字典键"""
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 class Config:
     def __init__(self) -> None:
         # 将CSRF（跨站请求伪造）保护设置为禁用状态
@@ -63,6 +70,12 @@ class Config:
         self.SQLALCHEMY_ENGINE_OPTIONS = {
             "pool_size": int(_get_env("SQLALCHEMY_POOL_SIZE")),
             "pool_recycle": int(_get_env("SQLALCHEMY_POOL_RECYCLE")),
+            "insertmanyvalues_page_size": int(
+                _get_env("SQLALCHEMY_INSERTMANYVALUES_PAGE_SIZE"),
+            ),
+            # JSON/JSONB字段使用orjson进行序列化与反序列化
+            "json_serializer": _json_serializer,
+            "json_deserializer": orjson.loads,
         }
         self.SQLALCHEMY_ECHO = _get_bool_env("SQLALCHEMY_ECHO")
 
@@ -72,6 +85,27 @@ class Config:
         self.WEAVIATE_GRPC_HOST = _get_env("WEAVIATE_GRPC_HOST")
         self.WEAVIATE_GRPC_PORT = _get_env("WEAVIATE_GRPC_PORT")
 
+        # 向量数据库上传配置
+        self.VECTOR_UPLOAD_BATCH_SIZE = int(_get_env("VECTOR_UPLOAD_BATCH_SIZE"))
+        self.VECTOR_UPLOAD_CONCURRENCY = int(_get_env("VECTOR_UPLOAD_CONCURRENCY"))
+
+        # jieba关键词提取进程池配置
+        self.JIEBA_PROCESS_POOL_SIZE = int(_get_env("JIEBA_PROCESS_POOL_SIZE"))
+
+        # 后台任务线程池配置
+        self.CONVERSATION_BACKGROUND_WORKERS = int(
+            _get_env("CONVERSATION_BACKGROUND_WORKERS"),
+        )
+        self.RETRIEVAL_BATCH_SEARCH_WORKERS = int(
+            _get_env("RETRIEVAL_BATCH_SEARCH_WORKERS"),
+        )
+        self.RETRIEVAL_HYBRID_SEARCH_WORKERS = int(
+            _get_env("RETRIEVAL_HYBRID_SEARCH_WORKERS"),
+        )
+        self.SEGMENT_VECTOR_UPDATE_WORKERS = int(
+            _get_env("SEGMENT_VECTOR_UPDATE_WORKERS"),
+        )
+
         # Redis配置
         self.REDIS_HOST = _get_env("REDIS_HOST")
         self.REDIS_PORT = int(_get_env("REDIS_PORT"))
@@ -89,6 +123,16 @@ class Config:
             "broker_connection_retry_on_startup": _get_bool_env(
                 "CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP",
             ),
+            # 定时任务配置，需要配合celery beat运行
+            "beat_schedule": {
+                # 定期清理过期的验证码记录
+                "purge-expired-verification-codes": {
+                    "task": "src.task.mail_task.purge_expired_verification_codes",
+                    "schedule": int(
+                        _get_env("CELERY_PURGE_VERIFICATION_CODE_INTERVAL"),
+                    ),
+                },
+            },
         }
 
         # 辅助Agent应用id标识
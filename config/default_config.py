@@ -5,12 +5,26 @@ DEFAULT_CONFIG = {
     "SQLALCHEMY_DATABASE_URI": "",
     "SQLALCHEMY_POOL_SIZE": 30,
     "SQLALCHEMY_POOL_RECYCLE": 3600,
+    "SQLALCHEMY_INSERTMANYVALUES_PAGE_SIZE": 1000,
     "SQLALCHEMY_ECHO": "True",
     # Weaviate向量数据库配置
     "WEAVIATE_HTTP_HOST": "localhost",
     "WEAVIATE_HTTP_PORT": 8080,
     "WEAVIATE_GRPC_HOST": "localhost",
     "WEAVIATE_GRPC_PORT": 50051,
+    # 向量数据库上传配置
+    "VECTOR_UPLOAD_BATCH_SIZE": 64,
+    "VECTOR_UPLOAD_CONCURRENCY": 2,
+    # jieba关键词提取进程池的进程数，不大于1时不使用进程池
+    "JIEBA_PROCESS_POOL_SIZE": 2,
+    # 生成会话摘要、会话名称等后台任务线程池的线程数
+    "CONVERSATION_BACKGROUND_WORKERS": 16,
+    # 批量检索时并发执行各条查询的线程数
+    "RETRIEVAL_BATCH_SEARCH_WORKERS": 4,
+    # 混合检索时并发执行语义检索的线程数
+    "RETRIEVAL_HYBRID_SEARCH_WORKERS": 8,
+    # 更新文档片段时并发执行向量化及向量数据库写入的线程数
+    "SEGMENT_VECTOR_UPDATE_WORKERS": 4,
     # Redis配置
     "REDIS_HOST": "localhost",
     "REDIS_PORT": 6379,
@@ -24,6 +38,7 @@ DEFAULT_CONFIG = {
     "CELERY_TASK_IGNORE_RESULT": "False",
     "CELERY_RESULT_EXPIRES": 3600,
     "CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP": "True",
+    "CELERY_PURGE_VERIFICATION_CODE_INTERVAL": 300,
     # 辅助Agent智能体应用id
     "ASSISTANT_AGENT_ID": "94ad01a7-3dff-4830-87ff-e87662fc4eda",
     # 阿里云配置
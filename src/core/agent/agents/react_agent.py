@@ -36,7 +36,7 @@ class ReACTAgent(FunctionCallAgent):
         """重写长期记忆召回节点，使用prompt实现工具调用及规范数据生成"""
         # 1.判断是否支持工具调用，如果支持工具调用，
         # 则可以直接使用工具智能体的长期记忆召回节点
-        if ModelFeature.TOOL_CALL in self.llm.features:
+        if self.llm.supports_tool_call:
             return super()._long_term_memory_recall_node(state)
 
         # 2.根据传递的智能体配置判断是否需要召回长期记忆
@@ -133,7 +133,7 @@ class ReACTAgent(FunctionCallAgent):
 
         """
         # 检查LLM是否支持工具调用功能，如果支持则直接使用父类的实现
-        if ModelFeature.TOOL_CALL in self.llm.features:
+        if self.llm.supports_tool_call:
             return super()._llm_node(state)
 
         # 检查当前迭代次数是否超过最大限制，如果超过则返回最大迭代响应
@@ -38,6 +38,9 @@ class BuiltinAppEntity(BaseModel):
     suggested_after_answer: dict[str, Any] = Field(
         default_factory=lambda: DEFAULT_APP_CONFIG.get("suggested_after_answer"),
     )
+    prompt_cache: dict[str, Any] = Field(
+        default_factory=lambda: DEFAULT_APP_CONFIG.get("prompt_cache"),
+    )
     review_config: dict[str, Any] = Field(
         default_factory=lambda: DEFAULT_APP_CONFIG.get("review_config"),
     )
@@ -1,4 +1,5 @@
 import tempfile
+from collections.abc import Iterator
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -15,11 +16,27 @@ from langchain_community.document_loaders import (
     UnstructuredXMLLoader,
 )
 from langchain_community.tools import requests
+from langchain_core.document_loaders import BaseLoader
 from langchain_core.documents import Document as LCDocument
 
 from src.model.upload_file import UploadFile
 from src.service.cos_service import CosService
 
+# 文件扩展名与对应文档加载器的映射，未列出的扩展名按普通文本或非结构化文件加载
+_LOADERS_BY_EXTENSION: dict[str, type[BaseLoader]] = {
+    ".xlsx": UnstructuredExcelLoader,
+    ".xls": UnstructuredExcelLoader,
+    ".pdf": PyPDFLoader,
+    ".md": UnstructuredMarkdownLoader,
+    ".markdown": UnstructuredMarkdownLoader,
+    ".html": UnstructuredHTMLLoader,
+    ".htm": UnstructuredHTMLLoader,
+    ".csv": UnstructuredCSVLoader,
+    ".ppt": UnstructuredPowerPointLoader,
+    ".pptx": UnstructuredPowerPointLoader,
+    ".xml": UnstructuredXMLLoader,
+}
+
 
 @inject
 @dataclass
@@ -80,6 +97,39 @@ class FileExtractor:
                 is_unstructured=is_unstructured,
             )
 
+    def iload(
+        self,
+        upload_file: UploadFile,
+        *,
+        is_unstructured: bool = False,
+    ) -> Iterator[LCDocument]:
+        """以迭代器的方式逐个加载上传文件中的文档
+
+        与load不同，该方法不会一次性把整个文件解析后的内容全部放入内存，
+        而是在解析出每个文档后立即返回，调用方处理完即可释放。
+
+        Args:
+            upload_file: 上传的文件对象
+            is_unstructured: 是否使用非结构化加载器，默认为False
+
+        Yields:
+            LCDocument: 逐个解析出的文档
+
+        """
+        # 创建临时目录用于存储下载的文件，迭代结束后才会被删除
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            # 构建临时文件路径，保持原始文件名
+            file_path = Path(tmp_dir) / Path(upload_file.key).name
+
+            # 从COS服务下载文件到临时目录
+            self.cos_service.download_file(upload_file.key, file_path)
+
+            # 使用加载器的惰性加载接口逐个返回文档
+            yield from self._get_loader(
+                file_path,
+                is_unstructured=is_unstructured,
+            ).lazy_load()
+
     @classmethod
     def load_from_url(
         cls,
@@ -132,30 +182,7 @@ class FileExtractor:
 
         """
         delimiter = "\n\n"  # 文档分隔符
-        file_extension = Path(file_path).suffix.lower()  # 获取文件扩展名并转为小写
-
-        # 根据文件扩展名选择对应的加载器
-        if file_extension in [".xlsx", ".xls"]:
-            loader = UnstructuredExcelLoader(file_path)
-        elif file_extension == ".pdf":
-            loader = PyPDFLoader(file_path)
-        elif file_extension in [".md", ".markdown"]:
-            loader = UnstructuredMarkdownLoader(file_path)
-        elif file_extension in [".thm", "html"]:
-            loader = UnstructuredHTMLLoader(file_path)
-        elif file_extension == ".csv":
-            loader = UnstructuredCSVLoader(file_path)
-        elif file_extension in [".ppt", ".pptx"]:
-            loader = UnstructuredPowerPointLoader(file_path)
-        elif file_extension == ".xml":
-            loader = UnstructuredXMLLoader(file_path)
-        else:
-            # 对于其他类型文件，根据is_unstructured参数选择加载器
-            loader = (
-                UnstructuredFileLoader(file_path)
-                if is_unstructured
-                else TextLoader(file_path)
-            )
+        loader = cls._get_loader(file_path, is_unstructured=is_unstructured)
 
         # 根据return_text参数决定返回格式
         return (
@@ -163,3 +190,34 @@ class FileExtractor:
             if return_text
             else loader.load()
         )
+
+    @classmethod
+    def _get_loader(
+        cls,
+        file_path: Path,
+        *,
+        is_unstructured: bool = False,
+    ) -> BaseLoader:
+        """根据文件扩展名选择对应的文档加载器
+
+        Args:
+            file_path (Path): 文件路径
+            is_unstructured (bool, optional): 是否使用非结构化加载器. 默认为 False
+
+        Returns:
+            BaseLoader: 文档加载器实例
+
+        """
+        file_extension = Path(file_path).suffix.lower()  # 获取文件扩展名并转为小写
+
+        # 根据文件扩展名选择对应的加载器
+        loader_cls = _LOADERS_BY_EXTENSION.get(file_extension)
+        if loader_cls is not None:
+            return loader_cls(file_path)
+
+        # 对于其他类型文件，根据is_unstructured参数选择加载器
+        return (
+            UnstructuredFileLoader(file_path)
+            if is_unstructured
+            else TextLoader(file_path)
+        )
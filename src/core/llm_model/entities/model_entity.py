@@ -1,6 +1,7 @@
 from abc import ABC
 from collections.abc import Sequence
 from enum import Enum
+from functools import cached_property
 from typing import Any
 
 import tiktoken
@@ -93,6 +94,11 @@ class BaseLanguageModel(LCBaseLanguageModel, ABC):
     features: list[ModelFeature] = Field(default_factory=list)  # 模型特性
     metadata: dict[str, Any] = Field(default_factory=dict)  # 模型元数据信息
 
+    @cached_property
+    def supports_tool_call(self) -> bool:
+        """模型是否支持工具调用，特性列表在实例化后不再变化，因此只需计算一次"""
+        return ModelFeature.TOOL_CALL in self.features
+
     def get_pricing(self) -> tuple[float, float, float]:
         """获取LLM对应的价格信息，返回数据格式为(输入价格, 输出价格, 单位)"""
         # 1.计算获取输入价格、输出价格、单位
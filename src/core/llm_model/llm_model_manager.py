@@ -1,11 +1,13 @@
+from functools import cached_property
 from pathlib import Path
-from typing import Self
+from typing import Any, Self
 
 import yaml
 from injector import inject, singleton
 from pydantic import BaseModel, Field, model_validator
 
 from src.exception import NotFoundException
+from src.lib.helper import convert_model_to_dict
 
 from .entities.model_entity import BaseLanguageModel, ModelType
 from .entities.provider_entity import Provider, ProviderEntity
@@ -54,6 +56,30 @@ class LLMModelManager(BaseModel):
         """获取所有提供者列表信息"""
         return list(self.provider_map.values())
 
+    @cached_property
+    def language_models(self) -> tuple[dict[str, Any], ...]:
+        """所有提供者及其模型的序列化快照，配置在进程内静态不变，只构建一次"""
+        language_models = []
+        for provider in self.get_providers():
+            # 1.获取提供商实体和模型实体列表
+            provider_entity = provider.provider_entity
+            model_entities = provider.get_model_entities()
+
+            # 2.构建响应字典结构
+            language_models.append(
+                {
+                    "name": provider_entity.name,
+                    "position": provider.position,
+                    "label": provider_entity.label,
+                    "icon": provider_entity.icon,
+                    "description": provider_entity.description,
+                    "background": provider_entity.background,
+                    "support_model_types": provider_entity.supported_model_types,
+                    "models": convert_model_to_dict(model_entities),
+                },
+            )
+        return tuple(language_models)
+
     def get_model_class_by_provider_and_type(
         self,
         provider_name: str,
@@ -1,13 +1,13 @@
-from collections import Counter
 from uuid import UUID
 
 from langchain_core.callbacks import CallbackManagerForRetrieverRun
 from langchain_core.documents import Document as LCDocument
 from langchain_core.retrievers import BaseRetriever
 from pydantic import Field
+from sqlalchemy import desc, func
 
 from pkg.sqlalchemy.sqlalchemy import SQLAlchemy
-from src.model.dataset import KeywordTable, Segment
+from src.model.dataset import KeywordIndex, Segment
 from src.service.jieba_service import JiebaService
 
 
@@ -37,44 +37,35 @@ class FullTextRetriever(BaseRetriever):
 
         该方法执行以下步骤：
         1. 使用jieba服务从查询中提取关键词
-        2. 从数据库中获取关键词表并匹配相关文档片段ID
-        3. 统计文档片段ID的出现频率并排序
+        2. 在关键词索引表中匹配相关文档片段ID
+        3. 统计文档片段ID的命中次数并排序
         4. 从数据库查询对应的文档片段
         5. 构建并返回格式化的文档对象列表
 
         """
-        # 使用jieba服务从查询中提取最多10个关键词
-        keywords = self.jieba_service.extract_keywords(query, 10)
+        # 使用jieba服务从查询中提取最多10个关键词，重复查询直接命中缓存
+        keywords = self.jieba_service.extract_query_keywords(query, 10)
 
-        # 从数据库中获取所有相关的关键词表
-        keyword_tables = [
-            keyword_table
-            for (keyword_table,) in self.db.session.query(KeywordTable)
+        # 获取要返回的文档数量，默认为4
+        k = self.search_kwargs.get("k", 4)
+        # 在关键词索引表中统计每个文档片段命中的关键词数量，并取命中最多的k个片段ID
+        top_10_ids = (
+            self.db.session.query(KeywordIndex)
             .with_entities(
-                KeywordTable.keyword_table,  # 只查询关键词表字段
+                KeywordIndex.segment_id,
+                func.count(KeywordIndex.keyword).label("freq"),
             )
             .filter(
-                KeywordTable.dataset_id.in_(
+                KeywordIndex.dataset_id.in_(
                     self.dataset_ids,
-                ),  # 筛选指定数据集的关键词表
+                ),  # 筛选指定数据集的关键词索引
+                KeywordIndex.keyword.in_(keywords),  # 筛选提取出的关键词
             )
+            .group_by(KeywordIndex.segment_id)
+            .order_by(desc("freq"))
+            .limit(k)
             .all()
-        ]
-
-        all_ids = []  # 存储所有匹配的文档片段ID
-        # 遍历所有关键词表，查找匹配的关键词
-        for keyword_table in keyword_tables:
-            for keyword, segment_ids in keyword_table.items():
-                if keyword in keywords:  # 如果关键词在提取的关键词列表中
-                    all_ids.extend(segment_ids)  # 添加对应的文档片段ID
-
-        # 使用Counter统计每个文档片段ID出现的频率
-        id_counter = Counter(all_ids)
-
-        # 获取要返回的文档数量，默认为4
-        k = self.search_kwargs.get("k", 4)
-        # 获取出现频率最高的k个文档片段ID
-        top_10_ids = id_counter.most_common(k)
+        )
 
         # 从数据库查询对应的文档片段
         segments = (
@@ -91,7 +82,9 @@ class FullTextRetriever(BaseRetriever):
 
         # 按照关键词匹配频率对文档片段进行排序
         sorted_segments = [
-            segment_dict[str(id)] for id, freq in top_10_ids if id in segment_dict
+            segment_dict[str(id)]
+            for id, freq in top_10_ids
+            if str(id) in segment_dict
         ]
 
         # 构建并返回LangChain文档对象列表
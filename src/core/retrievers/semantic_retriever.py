@@ -41,7 +41,9 @@ class SemanticRetriever(BaseRetriever):
 
         """
         # 获取要返回的文档数量，默认为4
-        k = self.search_kwargs.pop("k", 4)
+        # 复制一份检索参数后再取出k，避免修改检索器自身的配置导致检索器无法复用
+        search_kwargs = dict(self.search_kwargs)
+        k = search_kwargs.pop("k", 4)
 
         # 使用向量存储进行相似性搜索，并获取相关性分数
         search_result = self.vector_store.similarity_search_with_relevance_scores(
@@ -62,7 +64,7 @@ class SemanticRetriever(BaseRetriever):
                     ],
                 ),
                 # 添加其他搜索参数
-                **self.search_kwargs,
+                **search_kwargs,
             },
         )
 
@@ -78,6 +78,9 @@ DEFAULT_APP_CONFIG = {
     "suggested_after_answer": {
         "enable": True,
     },
+    "prompt_cache": {
+        "enable": False,
+    },
     "speech_to_text": {
         "enable": False,
     },
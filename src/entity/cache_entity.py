@@ -1,6 +1,14 @@
 LOCK_EXPIRE_TIME = 600
 LOCK_DOCUMENT_UPDATE_ENABLED = "lock:document:update:enabled_{document_id}"
-LOCK_KEYWORD_TABLE_UPDATE_KEYWORD_TABLE = (
-    "lock:keyword_table:update:keyword_table_{dataset_id}"
-)
 LOCK_SEGMENT_UPDATE_ENABLED = "lock:segment:update:enabled_{dataset_id}"
+
+# 文档片段启用状态的切换版本号，每次切换时递增，异步任务据此判断状态是否已再次切换
+SEGMENT_ENABLED_VERSION_EXPIRE_TIME = 86400
+SEGMENT_ENABLED_VERSION = "segment:enabled:version:{segment_id}"
+
+# OpenAPI非流式对话的精确匹配提示缓存
+PROMPT_CACHE_EXPIRE_TIME = 3600
+PROMPT_CACHE_KEY = "cache:openapi:prompt:{prompt_hash}"
+
+# 知识库检索结果缓存的代数，知识库内容变化时递增，使各进程中的检索结果缓存失效
+RETRIEVAL_CACHE_GENERATION = "cache:retrieval:generation"
@@ -40,7 +40,7 @@ class LLMModelHandler:
     @swag_from(get_swagger_path("llm_model_handler/get_llm_model_icon.yaml"))
     def get_llm_model_icon(self, provider_name: str) -> Response:
         """根据传递的提供者名字获取指定提供商的icon图标"""
-        icon, mimetype = self.llm_model_service.get_language_model_icon(
+        icon, mimetype, etag = self.llm_model_service.get_language_model_icon(
             provider_name,
         )
-        return send_file(io.BytesIO(icon), mimetype)
+        return send_file(io.BytesIO(icon), mimetype, etag=etag)
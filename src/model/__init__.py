@@ -4,7 +4,15 @@ from .api_key import ApiKey
 from .api_tool import ApiTool, ApiToolProvider
 from .app import App, AppConfig, AppConfigVersion, AppDatasetJoin
 from .conversation import Conversation, Message, MessageAgentThought
-from .dataset import Dataset, DatasetQuery, Document, KeywordTable, ProcessRule, Segment
+from .dataset import (
+    Dataset,
+    DatasetQuery,
+    Document,
+    KeywordIndex,
+    KeywordTable,
+    ProcessRule,
+    Segment,
+)
 from .end_user import EndUser
 from .recharge_order import RechargeOrder
 from .upload_file import UploadFile
@@ -26,6 +34,7 @@ __all__ = [
     "DatasetQuery",
     "Document",
     "EndUser",
+    "KeywordIndex",
     "KeywordTable",
     "Message",
     "MessageAgentThought",
@@ -235,7 +235,19 @@ class VerificationCode(db.Model):
     """验证码记录表模型"""
 
     __tablename__ = "verification_code"
-    __table_args__ = (PrimaryKeyConstraint("id", name="pk_verification_code_id"),)
+    __table_args__ = (
+        PrimaryKeyConstraint("id", name="pk_verification_code_id"),
+        # 校验时只查询未使用的验证码，使用部分索引覆盖过滤条件与按创建时间倒序的排序
+        Index(
+            "idx_verification_code_account_code_created_at",
+            "account",
+            "code",
+            text("created_at DESC"),
+            postgresql_where=text("used IS false"),
+        ),
+        # 定期清理过期验证码时按过期时间查找记录
+        Index("idx_verification_code_expires_at", "expires_at"),
+    )
 
     id = Column(
         UUID,
@@ -319,6 +319,12 @@ class AppConfig(db.Model):
         server_default=text("'{\"enable\": true}'::jsonb"),
         info={"description": "对话后自动生成建议问题"},
     )
+    prompt_cache = Column(
+        JSONB,
+        nullable=False,
+        server_default=text("'{\"enable\": false}'::jsonb"),
+        info={"description": "相同提问的回答缓存配置"},
+    )
     speech_to_text = Column(
         JSONB,
         nullable=False,
@@ -454,6 +460,12 @@ class AppConfigVersion(db.Model):
         server_default=text("'{\"enable\": true}'::jsonb"),
         info={"description": "对话后自动生成建议问题"},
     )
+    prompt_cache = Column(
+        JSONB,
+        nullable=False,
+        server_default=text("'{\"enable\": false}'::jsonb"),
+        info={"description": "相同提问的回答缓存配置"},
+    )
     speech_to_text = Column(
         JSONB,
         nullable=False,
@@ -298,13 +298,22 @@ class Segment(db.Model):
     __tablename__ = "segment"
     __table_args__ = (
         PrimaryKeyConstraint("id", name="pk_segment_id"),
-        UniqueConstraint("hash", name="uk_segment_hash"),  # 片段哈希值唯一
+        # 同一文档内片段哈希值唯一，不同文档（包括其他账户的文档）可以包含相同内容
+        UniqueConstraint("document_id", "hash", name="uk_segment_document_id_hash"),
         Index("idx_segment_account_id", "account_id"),
         Index("idx_segment_dataset_id", "dataset_id"),
-        Index("idx_segment_document_id", "document_id"),
+        # 复合索引同时覆盖按文档过滤与按位置排序，也可替代单独的文档ID索引
+        Index("idx_segment_document_id_position", "document_id", "position"),
         Index("idx_segment_node_id", "node_id"),
         Index("idx_segment_status", "status"),
         Index("idx_segment_enabled", "enabled"),
+        # pg_trgm 三元组 GIN 索引，加速分页列表中片段内容的 ILIKE 模糊搜索
+        Index(
+            "idx_segment_content_trgm",
+            "content",
+            postgresql_using="gin",
+            postgresql_ops={"content": "gin_trgm_ops"},
+        ),
     )
 
     id = Column(
@@ -478,6 +487,43 @@ class KeywordTable(db.Model):
     )
 
 
+class KeywordIndex(db.Model):
+    """关键词索引表模型，每行记录一个关键词与一个片段的对应关系"""
+
+    __tablename__ = "keyword_index"
+    __table_args__ = (
+        PrimaryKeyConstraint(
+            "dataset_id",
+            "keyword",
+            "segment_id",
+            name="pk_keyword_index",
+        ),
+        Index("idx_keyword_index_segment_id", "segment_id"),
+    )
+
+    dataset_id = Column(
+        UUID,
+        nullable=False,
+        info={"description": "关联知识库 id"},
+    )
+    keyword = Column(
+        String(255),
+        nullable=False,
+        info={"description": "关键词"},
+    )
+    segment_id = Column(
+        UUID,
+        nullable=False,
+        info={"description": "关联片段 id"},
+    )
+    created_at = Column(
+        DateTime,
+        nullable=False,
+        server_default=text("CURRENT_TIMESTAMP(0)"),
+        info={"description": "创建时间"},
+    )
+
+
 class DatasetQuery(db.Model):
     """知识库查询表模型"""
 
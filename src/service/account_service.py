@@ -68,6 +68,33 @@ class AccountService(BaseService):
             .one_or_none()
         )
 
+    def get_account_with_oauth(
+        self,
+        provider_name: str,
+        openid: str,
+    ) -> tuple[Account, AccountOAuth] | None:
+        """通过OAuth提供商名称和openid一次性获取账户及其OAuth绑定信息
+
+        Args:
+            provider_name (str): OAuth提供商名称（如'google', 'github'等）
+            openid (str): OAuth提供商返回的用户唯一标识
+
+        Returns:
+            tuple[Account, AccountOAuth] | None: 账户对象和账户OAuth对象，
+            如果不存在绑定关系则返回None
+
+        """
+        row = (
+            self.db.session.query(Account, AccountOAuth)
+            .join(AccountOAuth, AccountOAuth.account_id == Account.id)
+            .filter(
+                AccountOAuth.provider == provider_name,
+                AccountOAuth.openid == openid,
+            )
+            .one_or_none()
+        )
+        return tuple(row) if row else None
+
     def get_account_by_email(self, email: str) -> Account:
         """通过邮箱地址获取账户信息
 
@@ -319,6 +319,7 @@ class AppConfigService(BaseService):
                 - opening_statement: 开场白
                 - opening_questions: 开场问题
                 - suggested_after_answer: 回答后的建议
+                - prompt_cache: 回答缓存配置
                 - speech_to_text: 语音转文本配置
                 - text_to_speech: 文本转语音配置
                 - review_config: 审核配置
@@ -339,6 +340,7 @@ class AppConfigService(BaseService):
             "opening_statement": app_config.opening_statement,
             "opening_questions": app_config.opening_questions,
             "suggested_after_answer": app_config.suggested_after_answer,
+            "prompt_cache": app_config.prompt_cache,
             "speech_to_text": app_config.speech_to_text,
             "text_to_speech": app_config.text_to_speech,
             "review_config": app_config.review_config,
@@ -27,7 +27,7 @@ from src.core.agent.agents.function_call_agent import FunctionCallAgent
 from src.core.agent.agents.react_agent import ReACTAgent
 from src.core.agent.entities.agent_entity import AgentConfig
 from src.core.agent.entities.queue_entity import QueueEvent
-from src.core.llm_model.entities.model_entity import ModelFeature, ModelParameterType
+from src.core.llm_model.entities.model_entity import ModelParameterType
 from src.core.llm_model.llm_model_manager import LLMModelManager
 from src.core.memory.token_buffer_memory import TokenBufferMemory
 from src.core.tools.builtin_tools.providers.builtin_provider_manager import (
@@ -595,9 +595,7 @@ class AppService(BaseService):
         # 根据LLM模型特性选择合适的Agent类：
         # - 如果模型支持工具调用功能，使用FunctionCallAgent
         # - 否则使用ReACTAgent
-        agent_class = (
-            FunctionCallAgent if ModelFeature.TOOL_CALL in llm.features else ReACTAgent
-        )
+        agent_class = FunctionCallAgent if llm.supports_tool_call else ReACTAgent
         # 创建FunctionCallAgent实例
         agent = agent_class(
             name="debug_agent",
@@ -1008,6 +1006,8 @@ class AppService(BaseService):
             opening_questions=draft_app_config["opening_questions"],
             # 设置建议配置
             suggested_after_answer=draft_app_config["suggested_after_answer"],
+            # 设置回答缓存配置
+            prompt_cache=draft_app_config["prompt_cache"],
             # 设置语音转文字配置
             speech_to_text=draft_app_config["speech_to_text"],
             # 设置文字转语音配置
@@ -1212,6 +1212,7 @@ class AppService(BaseService):
                 - opening_statement: 开场白
                 - opening_questions: 开场问题列表
                 - suggested_after_answer 对话后生成建议问题列表
+                - prompt_cache: 回答缓存配置
                 - speech_to_text: 语音转文本配置
                 - text_to_speech: 文本转语音配置
                 - review_config: 审核配置
@@ -1658,6 +1659,30 @@ class AppService(BaseService):
             raise ValidateErrorException(error_msg)
         return suggested_after_answer
 
+    def _validate_prompt_cache(self, prompt_cache: dict) -> dict:
+        """验证回答缓存配置
+
+        Args:
+            prompt_cache: 回答缓存配置字典，只包含布尔类型的enable键
+
+        Returns:
+            dict: 验证通过的回答缓存配置
+
+        Raises:
+            ValidateErrorException: 当配置格式不正确时抛出
+
+        """
+        if (
+            not isinstance(prompt_cache, dict)
+            or set(prompt_cache.keys()) != {"enable"}
+            or not isinstance(prompt_cache["enable"], bool)
+        ):
+            error_msg = (
+                "回答缓存配置必须是包含enable键的字典，且enable的值必须是布尔类型"
+            )
+            raise ValidateErrorException(error_msg)
+        return prompt_cache
+
     def _validate_opening_statement(self, opening_statement: str) -> str:
         """验证开场白配置
 
@@ -1887,6 +1912,7 @@ class AppService(BaseService):
             "opening_statement",  # 开场白
             "opening_questions",  # 开场问题
             "suggested_after_answer",  # 对话后生成的建议问题
+            "prompt_cache",  # 回答缓存配置
             "speech_to_text",  # 语音转文字配置
             "text_to_speech",  # 文字转语音配置
             "review_config",  # 审核配置
@@ -1975,6 +2001,12 @@ class AppService(BaseService):
                 )
             )
 
+        # 验证回答缓存配置
+        if "prompt_cache" in draft_app_config:
+            draft_app_config["prompt_cache"] = self._validate_prompt_cache(
+                draft_app_config["prompt_cache"],
+            )
+
         # 验证语音转文字配置
         if "speech_to_text" in draft_app_config:
             draft_app_config["speech_to_text"] = self._validate_speech_to_text(
@@ -100,6 +100,7 @@ class BuiltinAppService(BaseService):
                         "text_to_speech",
                         "review_config",
                         "suggested_after_answer",
+                        "prompt_cache",
                     },
                 ),
             )
@@ -1,8 +1,10 @@
+import atexit
 import json
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import UTC, datetime
-from threading import Thread
+from functools import cache
 from typing import Any
 from uuid import UUID
 
@@ -14,12 +16,12 @@ from langchain_core.prompts import (
 )
 from langchain_openai import ChatOpenAI
 from redis import Redis, RedisError
-from sqlalchemy import desc
+from sqlalchemy import desc, insert
 from sqlalchemy.orm import joinedload
 
 from pkg.paginator.paginator import Paginator
 from pkg.sqlalchemy import SQLAlchemy
-from src.core.agent.entities.queue_entity import QueueEvent
+from src.core.agent.entities.queue_entity import AgentThought, QueueEvent
 from src.entity.conversation_entity import (
     CONVERSATION_NAME_TEMPLATE,
     MAX_CONVERSATION_NAME_LENGTH,
@@ -48,6 +50,33 @@ from src.service.points_service import PointsService
 logger = logging.getLogger(__name__)
 
 
+@cache
+def _get_background_executor(max_workers: int) -> ThreadPoolExecutor:
+    """懒加载生成会话摘要、会话名称等后台任务共用的有界线程池，整个进程内只创建一次
+
+    Args:
+        max_workers (int): 线程池的最大线程数，由CONVERSATION_BACKGROUND_WORKERS配置
+
+    Returns:
+        ThreadPoolExecutor: 后台任务线程池
+
+    """
+    executor = ThreadPoolExecutor(
+        max_workers=max_workers,
+        thread_name_prefix="conversation-background",
+    )
+    # 进程退出时等待已提交的后台任务执行完毕
+    atexit.register(executor.shutdown, wait=True)
+    return executor
+
+
+def _log_background_exception(future: Future) -> None:
+    """记录后台任务执行过程中抛出的异常"""
+    if (exception := future.exception()) is not None:
+        error_msg = f"会话后台任务执行失败: {exception!s}"
+        logger.error(error_msg, exc_info=exception)
+
+
 @dataclass
 class AgentThoughtConfig:
     account_id: UUID
@@ -55,7 +84,9 @@ class AgentThoughtConfig:
     app_config: dict[str, Any]
     conversation_id: UUID
     message_id: UUID
-    agent_thoughts: dict[str, Any]
+    # 按事件发生顺序排列的思考记录，列表下标决定持久化时的position，
+    # save_agent_thoughts会将需要记录的思考一次性批量写入数据库
+    agent_thoughts: list[AgentThought]
 
 
 @inject
@@ -505,11 +536,19 @@ class ConversationService(BaseService):
         """
         # 初始化延迟时间计数器
         latency = 0
+        # 提前获取真实的Flask应用对象，供后台任务使用
+        flask_app = current_app._get_current_object()  # noqa: SLF001
+        background_executor = _get_background_executor(
+            flask_app.config["CONVERSATION_BACKGROUND_WORKERS"],
+        )
 
         # 获取对话和消息对象
         conversation = self.get(Conversation, config.conversation_id)
         message = self.get(Message, config.message_id)
 
+        # 需要持久化的思考记录，遍历结束后使用一条批量INSERT语句写入
+        agent_thought_rows = []
+
         # 遍历智能体思考记录，position表示事件在序列中的位置
         for position, agent_thought in enumerate(config.agent_thoughts, start=1):
             # 检查事件类型是否为需要记录的类型
@@ -523,31 +562,32 @@ class ConversationService(BaseService):
                 # 累加延迟时间
                 latency += agent_thought.latency
 
-                # 创建消息智能体思考记录
-                self.create(
-                    MessageAgentThought,
-                    app_id=config.app_id,  # 应用ID
-                    conversation_id=conversation.id,  # 对话ID
-                    message_id=message.id,  # 消息ID
-                    invoke_from=InvokeFrom.DEBUGGER,  # 调用来源
-                    created_by=config.account_id,  # 创建者ID
-                    position=position,  # 事件位置
-                    event=agent_thought.event,  # 事件类型
-                    thought=agent_thought.thought,  # 思考内容
-                    observation=agent_thought.observation,  # 观察结果
-                    tool=agent_thought.tool,  # 使用的工具
-                    tool_input=agent_thought.tool_input,  # 工具输入
-                    message=agent_thought.message,  # 消息内容
-                    message_token_count=agent_thought.message_token_count,
-                    message_unit_price=agent_thought.message_unit_price,
-                    message_price_unit=agent_thought.message_price_unit,
-                    answer=agent_thought.answer,  # 答案内容
-                    answer_token_count=agent_thought.answer_token_count,
-                    answer_unit_price=agent_thought.answer_unit_price,
-                    answer_price_unit=agent_thought.answer_price_unit,
-                    total_token_count=agent_thought.total_token_count,
-                    total_price=agent_thought.total_price,
-                    latency=agent_thought.latency,  # 延迟时间
+                # 收集消息智能体思考记录
+                agent_thought_rows.append(
+                    {
+                        "app_id": config.app_id,  # 应用ID
+                        "conversation_id": conversation.id,  # 对话ID
+                        "message_id": message.id,  # 消息ID
+                        "invoke_from": InvokeFrom.DEBUGGER,  # 调用来源
+                        "created_by": config.account_id,  # 创建者ID
+                        "position": position,  # 事件位置
+                        "event": agent_thought.event,  # 事件类型
+                        "thought": agent_thought.thought,  # 思考内容
+                        "observation": agent_thought.observation,  # 观察结果
+                        "tool": agent_thought.tool,  # 使用的工具
+                        "tool_input": agent_thought.tool_input,  # 工具输入
+                        "message": agent_thought.message,  # 消息内容
+                        "message_token_count": agent_thought.message_token_count,
+                        "message_unit_price": agent_thought.message_unit_price,
+                        "message_price_unit": agent_thought.message_price_unit,
+                        "answer": agent_thought.answer,  # 答案内容
+                        "answer_token_count": agent_thought.answer_token_count,
+                        "answer_unit_price": agent_thought.answer_unit_price,
+                        "answer_price_unit": agent_thought.answer_price_unit,
+                        "total_token_count": agent_thought.total_token_count,
+                        "total_price": agent_thought.total_price,
+                        "latency": agent_thought.latency,  # 延迟时间
+                    },
                 )
 
             # 如果是智能体消息事件
@@ -570,28 +610,24 @@ class ConversationService(BaseService):
                 # 如果启用了长期记忆功能
                 if config.app_config["long_term_memory"]["enable"]:
                     # 生成新的对话摘要
-                    Thread(
-                        target=self._generate_summary_and_update,
-                        kwargs={
-                            "flask_app": current_app._get_current_object(),  # noqa: SLF001
-                            "conversation_id": conversation.id,
-                            "query": message.query,
-                            "answer": agent_thought.answer,
-                        },
-                    ).start()
+                    background_executor.submit(
+                        self._generate_summary_and_update,
+                        flask_app=flask_app,
+                        conversation_id=conversation.id,
+                        query=message.query,
+                        answer=agent_thought.answer,
+                    ).add_done_callback(_log_background_exception)
 
                 # 如果是新对话，生成新的对话名称
                 if conversation.is_new:
-                    Thread(
-                        target=self._generate_conversation_name_and_update,
-                        kwargs={
-                            "flask_app": current_app._get_current_object(),  # noqa: SLF001
-                            "conversation_id": conversation.id,
-                            "query": message.query,
-                            "account": config.account_id,
-                            "app_id": config.app_id,
-                        },
-                    ).start()
+                    background_executor.submit(
+                        self._generate_conversation_name_and_update,
+                        flask_app=flask_app,
+                        conversation_id=conversation.id,
+                        query=message.query,
+                        account_id=config.account_id,
+                        app_id=config.app_id,
+                    ).add_done_callback(_log_background_exception)
 
             # 检查代理思考的事件状态是否为终止状态（停止、错误或超时）
             if agent_thought.event in [
@@ -608,6 +644,11 @@ class ConversationService(BaseService):
                 # 跳出循环，终止处理
                 break
 
+        # 使用一条批量INSERT语句写入所有思考记录，避免逐条插入带来的多次数据库往返
+        if agent_thought_rows:
+            with self.db.auto_commit():
+                self.db.session.execute(insert(MessageAgentThought), agent_thought_rows)
+
     def _generate_summary_and_update(
         self,
         flask_app: Flask,
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from functools import cache
 
 import tiktoken
 from injector import inject
@@ -9,6 +10,12 @@ from langchain_openai import OpenAIEmbeddings
 from redis import Redis
 
 
+@cache
+def _get_encoding() -> tiktoken.Encoding:
+    """获取并缓存GPT-3.5模型的编码器，避免每次计算token时重复查找"""
+    return tiktoken.encoding_for_model("gpt-3.5")
+
+
 @inject
 @dataclass
 class EmbeddingsService:
@@ -51,6 +58,8 @@ class EmbeddingsService:
             self._embeddings,  # 基础嵌入模型
             self._store,  # Redis存储后端
             namespace="embeddings",  # Redis命名空间，用于区分不同类型的缓存
+            # 同时缓存查询向量，重复的检索查询无需再次调用嵌入模型
+            query_embedding_cache=True,
         )
 
     @classmethod
@@ -68,10 +77,26 @@ class EmbeddingsService:
 
         """
         # 获取GPT-3.5模型的编码器
-        encoding = tiktoken.encoding_for_model("gpt-3.5")
+        encoding = _get_encoding()
         # 对输入文本进行编码并返回token数量
         return len(encoding.encode(query))
 
+    @classmethod
+    def calculate_token_counts(cls, queries: list[str]) -> list[int]:
+        """批量计算多个文本的token数量
+
+        Args:
+            queries (list[str]): 需要计算token数量的文本列表
+
+        Returns:
+            list[int]: 与输入文本一一对应的token数量列表
+
+        Note:
+            使用tiktoken的批量编码接口，在多线程中并行编码，减少逐条调用的开销
+
+        """
+        return [len(tokens) for tokens in _get_encoding().encode_batch(queries)]
+
     @property
     def store(self) -> RedisStore:
         """获取Redis存储实例
@@ -1,8 +1,12 @@
 import logging
 from pathlib import Path
 
+import faiss
+import numpy as np
 from injector import inject
 from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+from langchain_core.embeddings import Embeddings
 from langchain_core.tools import BaseTool, tool
 from pydantic import BaseModel, Field
 
@@ -14,6 +18,32 @@ from .embeddings_service import EmbeddingsService
 logger = logging.getLogger(__name__)
 
 
+class NormalizedEmbeddings(Embeddings):
+    """将向量归一化为单位长度的嵌入模型包装类
+
+    归一化后的向量使用内积即可等价计算余弦相似度，FAISS可以直接使用IndexFlatIP，
+    避免L2距离计算中额外的减法与平方运算。
+    """
+
+    def __init__(self, embeddings: Embeddings) -> None:
+        self._embeddings = embeddings
+
+    @classmethod
+    def _normalize(cls, vectors: list[list[float]]) -> list[list[float]]:
+        """将向量列表逐行归一化为单位长度"""
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        # 零向量保持不变，避免除零
+        norms[norms == 0] = 1
+        return (matrix / norms).tolist()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self._normalize(self._embeddings.embed_documents(texts))
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._normalize([self._embeddings.embed_query(text)])[0]
+
+
 @inject
 class FaissService:
     """Faiss向量数据库服务"""
@@ -30,15 +60,28 @@ class FaissService:
         faiss_vector_store_path = Path(__file__).parent.parent / "core" / "vector_store"
         index_name = "index"
 
-        # 3.初始化faiss向量数据库
+        # 3.使用归一化嵌入，检索时以内积代替L2距离计算余弦相似度
+        embeddings = NormalizedEmbeddings(self.embeddings_service.embeddings)
+
+        # 4.初始化faiss向量数据库
         try:
             if faiss_vector_store_path.exists():
                 self.faiss = FAISS.load_local(
                     folder_path=str(faiss_vector_store_path),
-                    embeddings=self.embeddings_service.embeddings,
+                    embeddings=embeddings,
                     index_name=index_name,
                     allow_dangerous_deserialization=True,
+                    distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT,
                 )
+                # 旧版本使用L2距离构建的索引，转换为内积索引并持久化
+                if self.faiss.index.metric_type != faiss.METRIC_INNER_PRODUCT:
+                    self.faiss.index = self._convert_to_inner_product_index(
+                        self.faiss.index,
+                    )
+                    self.faiss.save_local(
+                        folder_path=str(faiss_vector_store_path),
+                        index_name=index_name,
+                    )
                 # 验证索引维度
                 if hasattr(self.faiss.index, "d"):
                     print(f"FAISS索引维度: {self.faiss.index.d}")
@@ -48,7 +91,8 @@ class FaissService:
                 # 创建空索引
                 self.faiss = FAISS.from_texts(
                     texts=[""],  # 使用空文本创建初始索引
-                    embedding=self.embeddings_service.embeddings,
+                    embedding=embeddings,
+                    distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT,
                 )
                 # 保存索引
                 self.faiss.save_local(
@@ -62,6 +106,25 @@ class FaissService:
             logger.exception(error_msg)
             raise
 
+    @classmethod
+    def _convert_to_inner_product_index(cls, index: faiss.Index) -> faiss.Index:
+        """将已有索引中的向量归一化后重建为内积索引
+
+        Args:
+            index (faiss.Index): 原始的FAISS索引（通常为IndexFlatL2）
+
+        Returns:
+            faiss.Index: 存储单位向量的IndexFlatIP索引
+
+        """
+        vectors = index.reconstruct_n(0, index.ntotal)
+        faiss.normalize_L2(vectors)
+        ip_index = faiss.IndexFlatIP(index.d)
+        ip_index.add(vectors)
+        info_msg = f"FAISS索引已转换为内积索引，向量数: {index.ntotal}"
+        logger.info(info_msg)
+        return ip_index
+
     def convert_faiss_to_tool(self) -> BaseTool:
         """将Faiss向量数据库检索器转换成LangChain工具"""
         # 1.将Faiss向量数据库转换成检索器
@@ -1,16 +1,17 @@
+import asyncio
 import logging
-import re
 import uuid
-from concurrent.futures import ThreadPoolExecutor
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
 from datetime import UTC, datetime
+from functools import lru_cache
 from uuid import UUID
 
-from flask import Flask, current_app
+from flask import current_app
 from injector import inject
 from langchain_core.documents import Document as LCDocument
 from redis import Redis
-from sqlalchemy import func
+from sqlalchemy import func, insert, update
 from weaviate.classes.query import Filter
 
 from pkg.sqlalchemy.sqlalchemy import SQLAlchemy
@@ -21,16 +22,30 @@ from src.entity.cache_entity import (
 from src.entity.dataset_entity import DocumentStatus, SegmentStatus
 from src.exception.exception import NotFoundException
 from src.lib.helper import generate_text_hash
-from src.model.dataset import DatasetQuery, Document, KeywordTable, Segment
+from src.model.dataset import (
+    DatasetQuery,
+    Document,
+    KeywordIndex,
+    KeywordTable,
+    Segment,
+)
 from src.service.base_service import BaseService
 from src.service.embeddings_service import EmbeddingsService
 from src.service.jieba_service import JiebaService
 from src.service.keyword_table_service import KeywordTableService
 from src.service.process_rule_service import ProcessRuleService
+from src.service.retrieval_service import invalidate_retrieval_cache
 from src.service.vector_database_service import VectorDatabaseService
 
 logger = logging.getLogger(__name__)
 
+# 清理文本时需要删除的字符：控制字符（保留\t、\n、\r）、DEL字符以及无效字符\ufffe
+_EXTRA_TEXT_DELETE_BYTES = bytes([*range(0x09), 0x0B, 0x0C, *range(0x0E, 0x20), 0x7F])
+_EXTRA_TEXT_DELETE_TABLE = dict.fromkeys([*_EXTRA_TEXT_DELETE_BYTES, 0xFFFE])
+
+# 上传到向量数据库时段落携带的启用状态
+_ENABLED_FLAGS = {"document_enabled": True, "segment_enabled": True}
+
 
 @inject
 @dataclass
@@ -97,27 +112,25 @@ class IndexingService(BaseService):
 
         该方法执行以下操作：
         1. 获取文档下所有段落的ID列表
-        2. 从向量数据库中删除该文档的所有向量数据
+        2. 根据节点ID从向量数据库中批量删除该文档的所有向量数据
         3. 在数据库事务中删除该文档的所有段落记录
-        4. 使用分布式锁更新关键词表，移除与已删除段落相关的关键词
+        4. 从关键词表中移除与已删除段落相关的关键词
 
         """
-        # 获取文档下所有段落的ID列表
-        segment_ids = [
-            str(id)
-            for (id,) in self.db.session.query(Segment)
-            .with_entities(Segment.id)
+        # 获取文档下所有段落的ID和节点ID列表
+        segments = (
+            self.db.session.query(Segment)
+            .with_entities(Segment.id, Segment.node_id)
             .filter(
                 Segment.document_id == document_id,
             )
             .all()
-        ]
-
-        # 获取向量数据库集合，删除该文档的所有向量数据
-        collection = self.vector_database_service.collection
-        collection.data.delete_many(
-            where=Filter.by_property("document_id").equal(document_id),
         )
+        segment_ids = [str(id) for id, _ in segments]
+        node_ids = [node_id for _, node_id in segments]
+
+        # 批量删除该文档的所有向量数据，与关键词表使用同一批段落
+        self.vector_database_service.delete_by_node_ids(node_ids)
 
         # 在数据库事务中删除该文档的所有段落记录
         with self.db.auto_commit():
@@ -131,6 +144,9 @@ class IndexingService(BaseService):
             segment_ids,
         )
 
+        # 知识库内容已变化，使检索结果缓存失效
+        invalidate_retrieval_cache(self.redis_client)
+
     def update_document_enabled(self, document_id: UUID) -> None:
         """更新文档的启用状态。
 
@@ -237,6 +253,8 @@ class IndexingService(BaseService):
         finally:
             # 无论成功还是失败，最后都要删除更新锁缓存
             self.redis_client.delete(cache_key)
+            # 文档启用状态可能已变化，使检索结果缓存失效
+            invalidate_retrieval_cache(self.redis_client)
 
     def build_documents(self, document_ids: list[UUID]) -> None:
         """构建文档索引的主方法
@@ -264,10 +282,10 @@ class IndexingService(BaseService):
                     processing_started_at=datetime.now(UTC),
                 )
 
-                # 第一步：解析文档内容，转换为LangChain文档格式
+                # 第一步：解析文档内容，逐个转换为LangChain文档格式
                 lc_documents = self._parsing(document)
 
-                # 第二步：将文档分割成多个段落
+                # 第二步：边解析边将文档分割成多个段落
                 lc_segments = self._splitting(document, lc_documents)
 
                 # 第三步：对文档段落进行索引处理
@@ -289,14 +307,16 @@ class IndexingService(BaseService):
                     stopped_at=datetime.now(UTC),
                 )
 
+        # 新的段落已写入知识库，使检索结果缓存失效
+        invalidate_retrieval_cache(self.redis_client)
+
     def _completed(self, document: Document, lc_segments: list[LCDocument]) -> None:
         """完成文档处理的最后阶段。
 
         该方法负责完成文档处理的最后步骤，包括：
-        1. 设置所有文档段落的启用状态
-        2. 分批将段落添加到向量数据库
-        3. 更新数据库中段落的状态为已完成
-        4. 更新整个文档的状态为已完成
+        1. 分批设置段落的启用状态，并发地将段落添加到向量数据库
+        2. 批量更新数据库中段落的状态为已完成或错误
+        3. 更新整个文档的状态为已完成
 
         Args:
             document (Document): 要完成的文档对象
@@ -307,95 +327,93 @@ class IndexingService(BaseService):
             None
 
         """
-        # 遍历所有文档段落，设置启用状态
-        for lc_segment in lc_segments:
-            lc_segment.metadata["document_enabled"] = True  # 启用文档
-            lc_segment.metadata["segment_enabled"] = True  # 启用段落
-
-        def thread_func(
-            app: Flask,
-            chunks: list[LCDocument],
-            ids: list[UUID],
-        ) -> None:
-            # 创建Flask应用上下文，确保可以访问应用配置和数据库连接
-            with app.app_context():
-                try:
-                    # 将当前批次的文档段落添加到向量数据库中
-                    self.vector_database_service.vector_store.add_documents(
-                        chunks,
-                        ids=ids,
-                    )
+        # 并发上传所有批次，并区分上传成功与失败的段落
+        completed_ids, error_ids = asyncio.run(self._upload_segments(lc_segments))
 
-                    # 使用自动提交事务更新数据库
-                    with self.db.auto_commit():
-                        # 查询并更新指定ID的段落状态
-                        self.db.session.query(Segment).filter(
-                            Segment.node_id.in_(ids),  # 筛选指定ID的段落
-                        ).update(
-                            {
-                                # 设置段落状态为已完成
-                                "status": SegmentStatus.COMPLETED,
-                                # 记录完成时间（使用UTC时间）
-                                "completed_at": datetime.now(UTC),
-                                # 启用该段落，使其可用于搜索
-                                "enabled": True,
-                            },
-                        )
-                except Exception as e:
-                    # 构造错误信息，包含具体的异常内容
-                    error_msg = f"构建文档片段异常：{e!s}"
-                    # 记录异常日志，包含完整的错误堆栈信息
-                    logger.exception(error_msg)
-                    # 在发生异常时，使用自动提交事务更新数据库
-                    with self.db.auto_commit():
-                        # 查询并更新出错段落的状态
-                        self.db.session.query(Segment).filter(
-                            Segment.node_id.in_(ids),
-                        ).update(
-                            {
-                                # 设置段落状态为错误
-                                "status": SegmentStatus.ERROR,
-                                # 记录错误发生时间（使用UTC时间）
-                                "completed_at": datetime.now(UTC),
-                                # 禁用该段落，使其不可用于搜索
-                                "enabled": False,
-                            },
-                        )
-
-        # 创建线程池，最大工作线程数为5
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            # 用于存储所有异步任务的Future对象
-            futures = []
-            # 分批处理文档段落，每批10个
-            for i in range(0, len(lc_segments), 10):
-                chunks = lc_segments[i : i + 10]  # 获取当前批次的段落
-                ids = [chunk.metadata["node_id"] for chunk in chunks]  # 提取段落ID列表
-
-                app = current_app._get_current_object()  # noqa: SLF001
-                if hasattr(app, "app"):  # 如果是AppContext对象，获取其app属性
-                    app = app.app
-
-                # 提交异步任务到线程池
-                futures.append(
-                    executor.submit(
-                        thread_func,
-                        app,
-                        chunks,
-                        ids,
-                    ),
+        # 所有批次上传结束后，批量更新段落状态和文档状态，只提交一次事务
+        with self.db.auto_commit():
+            now = datetime.now(UTC)
+            if completed_ids:
+                self.db.session.query(Segment).filter(
+                    Segment.node_id.in_(completed_ids),
+                ).update(
+                    {
+                        # 设置段落状态为已完成
+                        "status": SegmentStatus.COMPLETED,
+                        # 记录完成时间（使用UTC时间）
+                        "completed_at": now,
+                        # 启用该段落，使其可用于搜索
+                        "enabled": True,
+                    },
+                )
+            if error_ids:
+                self.db.session.query(Segment).filter(
+                    Segment.node_id.in_(error_ids),
+                ).update(
+                    {
+                        # 设置段落状态为错误
+                        "status": SegmentStatus.ERROR,
+                        # 记录错误发生时间（使用UTC时间）
+                        "completed_at": now,
+                        # 禁用该段落，使其不可用于搜索
+                        "enabled": False,
+                    },
                 )
-            # 等待所有异步任务完成
-            for future in futures:
-                future.result()  # 获取任务结果，如果任务抛出异常，这里会重新抛出
 
-        # 更新整个文档的状态
-        self.update(
-            document,
-            status=DocumentStatus.COMPLETED,
-            completed_at=datetime.now(UTC),
-            enabled=True,
+            # 在同一事务中更新整个文档的状态
+            document.status = DocumentStatus.COMPLETED
+            document.completed_at = now
+            document.enabled = True
+
+    async def _upload_segments(
+        self,
+        lc_segments: list[LCDocument],
+    ) -> tuple[list[str], list[str]]:
+        """分批并发地将文档段落上传到向量数据库。
+
+        Args:
+            lc_segments (list[LCDocument]): 需要上传的段落列表
+
+        Returns:
+            tuple[list[str], list[str]]: 上传成功的节点ID列表和上传失败的节点ID列表
+
+        """
+        vector_store = self.vector_database_service.vector_store
+        # 从配置中读取单次上传的段落数量和同时进行的上传请求数量
+        batch_size = current_app.config["VECTOR_UPLOAD_BATCH_SIZE"]
+        # 限制同时进行的上传请求数量
+        semaphore = asyncio.Semaphore(current_app.config["VECTOR_UPLOAD_CONCURRENCY"])
+
+        async def upload(chunks: list[LCDocument], ids: list[str]) -> None:
+            async with semaphore:
+                await vector_store.aadd_documents(chunks, ids=ids)
+
+        # 按批次切分段落，设置启用状态，并提取每个批次的节点ID
+        batches = []
+        for i in range(0, len(lc_segments), batch_size):
+            chunks = lc_segments[i : i + batch_size]
+            for chunk in chunks:
+                chunk.metadata.update(_ENABLED_FLAGS)
+            batches.append((chunks, [chunk.metadata["node_id"] for chunk in chunks]))
+
+        results = await asyncio.gather(
+            *[upload(chunks, ids) for chunks, ids in batches],
+            return_exceptions=True,
         )
 
+        completed_ids, error_ids = [], []
+        for (_, ids), result in zip(batches, results, strict=True):
+            if isinstance(result, Exception):
+                # 构造错误信息，包含具体的异常内容
+                error_msg = f"构建文档片段异常：{result!s}"
+                # 记录异常日志，包含完整的错误堆栈信息
+                logger.error(error_msg, exc_info=result)
+                error_ids.extend(ids)
+            else:
+                completed_ids.extend(ids)
+
+        return completed_ids, error_ids
+
     def _indexing(
         self,
         document: Document,
@@ -418,69 +436,54 @@ class IndexingService(BaseService):
             None: 该方法不返回任何值，直接更新数据库中的记录
 
         """
-        # 遍历所有文档段落
-        for lc_segment in lc_segments:
-            # 使用jieba服务提取段落内容的前10个关键词
-            keywords = self.jieba_service.extract_keywords(lc_segment.page_content, 10)
+        # 使用jieba服务批量提取每个段落内容的前10个关键词
+        keywords_list = self.jieba_service.batch_extract_keywords(
+            [lc_segment.page_content for lc_segment in lc_segments],
+            10,
+        )
 
-            # 更新数据库中的段落记录
-            self.db.session.query(Segment).filter(
-                Segment.id == lc_segment.metadata["segment_id"],
-            ).update(
+        # 遍历所有文档段落，记录每个段落的关键词
+        indexing_completed_at = datetime.now(UTC)
+        segment_keywords = []
+        segment_updates = []
+        for lc_segment, keywords in zip(lc_segments, keywords_list, strict=True):
+            segment_id = lc_segment.metadata["segment_id"]
+            segment_keywords.append((segment_id, keywords))
+            segment_updates.append(
                 {
+                    "id": segment_id,
                     # 设置提取的关键词
                     "keywords": keywords,
                     # 更新段落状态为已索引
                     "status": SegmentStatus.INDEXING,
                     # 记录索引完成时间
-                    "indexing_completed_at": datetime.now(UTC),
+                    "indexing_completed_at": indexing_completed_at,
                 },
             )
 
-            # 获取知识库对应的关键词表记录
-            keyword_table_record = (
-                self.keyword_table_service.get_keyword_table_from_dataset_id(
-                    document.dataset_id,
-                )
-            )
-            # 将关键词表转换为集合形式，便于去重和快速查找
-            keyword_table = {
-                field: set(value)
-                for field, value in keyword_table_record.keyword_table.items()
-            }
-
-            # 更新关键词表，记录每个关键词对应的段落ID
-            for keyword in keywords:
-                # 如果关键词不存在，创建新的集合
-                if keyword not in keyword_table:
-                    keyword_table[keyword] = set()
-                # 将当前段落ID添加到关键词对应的集合中
-                keyword_table[keyword].add(lc_segment.metadata["segment_id"])
-
-            # 更新关键词表记录，将集合转换回列表形式
-            self.update(
-                keyword_table_record,
-                keyword_table={
-                    field: list(value) for field, value in keyword_table.items()
-                },
-            )
-
-        # 更新文档的索引完成时间
-        self.update(
-            document,
-            indexing_completed_at=datetime.now(UTC),
+        # 使用一次批量UPDATE更新所有段落记录，并在同一事务中更新文档的索引完成时间
+        with self.db.auto_commit():
+            if segment_updates:
+                self.db.session.execute(update(Segment), segment_updates)
+            document.indexing_completed_at = indexing_completed_at
+
+        # 将所有段落的关键词一次性写入知识库的关键词表
+        self.keyword_table_service.add_segment_keywords(
+            document.dataset_id,
+            segment_keywords,
         )
 
     def _splitting(
         self,
         document: Document,
-        lc_documents: list[LCDocument],
+        lc_documents: Iterable[LCDocument],
     ) -> list[LCDocument]:
         """将文档分割成多个段落，并创建对应的数据库记录
 
         Args:
             document: 要处理的文档对象
-            lc_documents: LangChain文档列表，包含要分割的文本内容
+            lc_documents: LangChain文档的可迭代对象，包含要分割的文本内容，
+            每个文档在分割后即可释放
 
         Returns:
             list[LCDocument]: 分割后的LangChain文档列表，每个文档包含元数据信息
@@ -488,23 +491,26 @@ class IndexingService(BaseService):
         """
         # 获取文档的处理规则
         process_rule = document.process_rule
-        # 根据处理规则获取文本分割器
+        # 根据处理规则获取文本分割器，递归分割时会反复计算相同片段的长度，
+        # 因此在当前文档范围内缓存token计算结果
         text_splitter = self.process_rule_service.get_text_splitter_by_process_rule(
             process_rule,
-            self.embeddings_service.calculate_token_count,
+            lru_cache(maxsize=100_000)(self.embeddings_service.calculate_token_count),
         )
 
-        # 清理每个文档的文本内容
+        lc_segments = []
         for lc_document in lc_documents:
+            # 清理文档的文本内容
             lc_document.page_content = (
                 self.process_rule_service.clean_text_by_process_rule(
                     lc_document.page_content,
                     process_rule,
                 )
             )
-
-        # 使用分割器将文档分割成多个段落
-        lc_segments = text_splitter.split_documents(lc_documents)
+            # 使用分割器将文档分割成多个段落，只保留分割后的段落
+            lc_segments.extend(text_splitter.split_documents([lc_document]))
+        # 按内容哈希去重，跳过已经存在的段落，避免重复计算token、向量化和上传
+        lc_segments, hashes = self._deduplicate_segments(document, lc_segments)
         # 获取当前文档的最大段落位置
         position = (
             self.db.session.query(func.coalesce(func.max(Segment.position), 0))
@@ -514,89 +520,168 @@ class IndexingService(BaseService):
             .scalar()
         )
 
-        segments = []
-        # 处理每个分割后的段落
-        for lc_segment in lc_segments:
+        # 批量计算所有段落的token数量
+        token_counts = self.embeddings_service.calculate_token_counts(
+            [lc_segment.page_content for lc_segment in lc_segments],
+        )
+
+        rows = []
+        # 处理每个分割后的段落，构建待插入的段落记录
+        for lc_segment, token_count, segment_hash in zip(
+            lc_segments,
+            token_counts,
+            hashes,
+            strict=True,
+        ):
             position += 1
             content = lc_segment.page_content
-            # 创建新的段落记录
-            segment = self.create(
-                Segment,
-                account_id=document.account_id,
-                dataset_id=document.dataset_id,
-                document_id=document.id,
-                node_id=uuid.uuid4(),
-                position=position,
-                content=content,
-                character_count=len(content),
-                token_count=self.embeddings_service.calculate_token_count(content),
-                hash=generate_text_hash(content),
-                status=SegmentStatus.WAITING,
+            rows.append(
+                {
+                    "account_id": document.account_id,
+                    "dataset_id": document.dataset_id,
+                    "document_id": document.id,
+                    "node_id": uuid.uuid4(),
+                    "position": position,
+                    "content": content,
+                    "character_count": len(content),
+                    "token_count": token_count,
+                    "hash": segment_hash,
+                    "status": SegmentStatus.WAITING,
+                },
             )
-            # 设置段落的元数据信息
+
+        # 使用一条批量INSERT语句创建所有段落记录，并按参数顺序返回生成的段落ID，
+        # 同时在同一事务中更新文档状态和统计信息
+        segment_ids = []
+        with self.db.auto_commit():
+            if rows:
+                segment_ids = self.db.session.scalars(
+                    insert(Segment).returning(
+                        Segment.id,
+                        sort_by_parameter_order=True,
+                    ),
+                    rows,
+                ).all()
+            document.token_count = sum(row["token_count"] for row in rows)
+            document.status = DocumentStatus.INDEXING
+            document.splitting_completed_at = datetime.now(UTC)
+
+        # 设置段落的元数据信息
+        for lc_segment, row, segment_id in zip(
+            lc_segments,
+            rows,
+            segment_ids,
+            strict=True,
+        ):
             lc_segment.metadata = {
                 "account_id": str(document.account_id),
                 "dataset_id": str(document.dataset_id),
                 "document_id": str(document.id),
-                "segment_id": str(segment.id),
-                "node_id": str(segment.node_id),
+                "segment_id": str(segment_id),
+                "node_id": str(row["node_id"]),
                 "document_enabled": False,
                 "segment_enabled": False,
             }
-            segments.append(segment)
-
-        # 更新文档状态和统计信息
-        self.update(
-            document,
-            token_count=sum([segment.token_count for segment in segments]),
-            status=DocumentStatus.INDEXING,
-            splitting_completed_at=datetime.now(UTC),
-        )
 
         return lc_segments
 
-    def _parsing(self, document: Document) -> list[LCDocument]:
-        """解析文档内容，将上传的文件转换为LangChain文档格式。
+    def _deduplicate_segments(
+        self,
+        document: Document,
+        lc_segments: list[LCDocument],
+    ) -> tuple[list[LCDocument], list[str]]:
+        """根据内容哈希对分割后的段落去重。
+
+        段落表的(文档ID, 哈希值)具有唯一约束，同一文档内内容相同的段落只会保留一条记录。
+        该方法使用一次查询找出该文档中已存在的哈希值，并过滤掉这些段落以及本次分割结果中
+        重复的段落；其他文档中的相同内容不受影响。
 
         Args:
-            document (Document): 待解析的文档对象，包含上传文件信息
+            document (Document): 段落所属的文档
+            lc_segments (list[LCDocument]): 分割后的段落列表
 
         Returns:
-            list[LCDocument]: 解析后的LangChain文档列表，每个文档都经过文本清理处理
+            tuple[list[LCDocument], list[str]]: 去重后的段落列表及其对应的哈希值列表
+
+        """
+        hashes = [
+            generate_text_hash(lc_segment.page_content) for lc_segment in lc_segments
+        ]
+        # 一次性查询当前文档中已经存在的哈希值
+        seen_hashes = set()
+        if hashes:
+            seen_hashes = {
+                segment_hash
+                for (segment_hash,) in self.db.session.query(Segment)
+                .with_entities(Segment.hash)
+                .filter(
+                    Segment.document_id == document.id,
+                    Segment.hash.in_(set(hashes)),
+                )
+                .all()
+            }
+
+        unique_segments, unique_hashes = [], []
+        for lc_segment, segment_hash in zip(lc_segments, hashes, strict=True):
+            if segment_hash in seen_hashes:
+                continue
+            seen_hashes.add(segment_hash)
+            unique_segments.append(lc_segment)
+            unique_hashes.append(segment_hash)
+
+        if len(unique_segments) < len(lc_segments):
+            info_msg = (
+                f"文档 {document.id} 跳过重复段落 "
+                f"{len(lc_segments) - len(unique_segments)} 个"
+            )
+            logger.info(info_msg)
+
+        return unique_segments, unique_hashes
+
+    def _parsing(self, document: Document) -> Iterator[LCDocument]:
+        """解析文档内容，将上传的文件逐个转换为LangChain文档格式。
+
+        该方法是一个生成器，文件中的内容被逐个解析、清理后立即交给调用方，
+        不会把整个文件的解析结果同时保存在内存中。
+
+        Args:
+            document (Document): 待解析的文档对象，包含上传文件信息
+
+        Yields:
+            LCDocument: 解析后的LangChain文档，已经过文本清理处理
 
         Process:
             1. 从文档对象获取上传文件
-            2. 使用file_extractor加载文件内容，启用非结构化模式
-            3. 对每个文档进行文本清理
-            4. 更新文档状态为SPLITTING，记录字符数和处理开始时间
+            2. 使用file_extractor逐个加载文件内容，启用非结构化模式
+            3. 对每个文档进行文本清理，并累加字符数
+            4. 全部解析完成后更新文档状态为SPLITTING，记录字符数和解析完成时间
 
         """
         # 获取文档的上传文件对象
         upload_file = document.upload_file
-        # 使用文件提取器加载文件内容，is_unstructured=True表示使用非结构化方式解析
-        lc_documents = self.file_extractor.load(upload_file, is_unstructured=True)
 
-        # 遍历每个解析后的文档
-        for lc_document in lc_documents:
+        character_count = 0
+        # 使用文件提取器逐个加载文件内容，is_unstructured=True表示使用非结构化方式解析
+        for lc_document in self.file_extractor.iload(
+            upload_file,
+            is_unstructured=True,
+        ):
             # 清理文档中的多余文本，如特殊字符、空白等
             lc_document.page_content = self._clean_extra_text(lc_document.page_content)
+            character_count += len(lc_document.page_content)
+            yield lc_document
 
         # 更新文档信息：
-        # - character_count: 计算所有文档内容的总字符数
+        # - character_count: 所有文档内容的总字符数
         # - status: 将文档状态更新为SPLITTING（分割中）
         # - parsing_completed_at: 记录解析完成的时间
         self.update(
             document,
-            character_count=sum(
-                [len(lc_document.page_content) for lc_document in lc_documents],
-            ),
+            character_count=character_count,
             status=DocumentStatus.SPLITTING,
             parsing_completed_at=datetime.now(UTC),
         )
 
-        # 返回处理后的文档列表
-        return lc_documents
-
     @classmethod
     def _clean_extra_text(cls, text: str) -> str:
         """清理文本中的特殊字符和无效字符
@@ -614,18 +699,20 @@ class IndexingService(BaseService):
         4. 将"<|"替换为"<"
 
         """
-        return re.sub(
-            r"<\|",
-            "<",
-            re.sub(
-                r"\|>",
-                ">",
-                re.sub(
-                    r"[\x00-\x08\x0B\x0C\x0E-\x1F\x7F\xEF\xBF\xBE]",
-                    "",
-                    re.sub("\ufffe", "", text),
-                ),
-            ),
+        # 纯ASCII文本走字节级快速路径，bytes.translate基于256字节查找表逐字节删除
+        if text.isascii():
+            return (
+                text.encode("ascii")
+                .translate(None, _EXTRA_TEXT_DELETE_BYTES)
+                .replace(b"|>", b">")
+                .replace(b"<|", b"<")
+                .decode("ascii")
+            )
+
+        return (
+            text.translate(_EXTRA_TEXT_DELETE_TABLE)
+            .replace("|>", ">")
+            .replace("<|", "<")
         )
 
     def delete_dataset(self, dataset_id: UUID) -> None:
@@ -660,6 +747,11 @@ class IndexingService(BaseService):
                     KeywordTable.dataset_id == dataset_id,
                 ).delete()
 
+                # 删除知识库下的所有关键词索引记录
+                self.db.session.query(KeywordIndex).filter(
+                    KeywordIndex.dataset_id == dataset_id,
+                ).delete()
+
                 # 删除知识库下的所有查询记录
                 self.db.session.query(DatasetQuery).filter(
                     DatasetQuery.dataset_id == dataset_id,
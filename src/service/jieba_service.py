@@ -1,12 +1,75 @@
+import atexit
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from functools import cache, lru_cache, partial
 
 import jieba
 import jieba.analyse
+from billiard.process import current_process as current_billiard_process
+from flask import current_app
 from injector import inject
 from jieba.analyse import default_tfidf
 
 from src.entity.jieba_entity import STOPWORD_SET
 
+# 段落数量达到该阈值时才使用进程池并行提取关键词，避免小文档承担进程间通信开销
+PARALLEL_EXTRACT_THRESHOLD = 32
+
+# 检索查询关键词缓存的最大条目数
+QUERY_KEYWORDS_CACHE_MAX_SIZE = 4096
+
+
+def _init_jieba_worker() -> None:
+    """进程池工作进程的初始化函数，设置停用词并提前加载jieba词典"""
+    default_tfidf.stop_words = STOPWORD_SET
+    jieba.initialize()
+
+
+def _extract_tags(text: str, top_k: int) -> list[str]:
+    """在工作进程中执行关键词提取，使用模块级函数以便被pickle序列化"""
+    return jieba.analyse.extract_tags(sentence=text, topK=top_k)
+
+
+@lru_cache(maxsize=QUERY_KEYWORDS_CACHE_MAX_SIZE)
+def _extract_query_keywords(query: str, top_k: int) -> tuple[str, ...]:
+    """提取检索查询的关键词并缓存，停用词集在进程内不变，因此无需失效处理"""
+    return tuple(jieba.analyse.extract_tags(sentence=query, topK=top_k))
+
+
+def _is_daemon_process() -> bool:
+    """判断当前是否为守护进程，Celery prefork工作进程即为billiard守护进程"""
+    return (
+        multiprocessing.current_process().daemon
+        or current_billiard_process().daemon
+    )
+
+
+@cache
+def _get_process_pool(max_workers: int) -> ProcessPoolExecutor | None:
+    """懒加载用于关键词提取的进程池，整个进程内只创建一次
+
+    守护进程不能创建子进程，且每个Celery工作进程各自创建进程池会成倍占用内存，
+    进程数不大于1时并行也没有收益，这些情况下返回None，由调用方在当前进程中提取。
+
+    Args:
+        max_workers (int): 进程池的最大进程数
+
+    Returns:
+        ProcessPoolExecutor | None: 进程池，不使用进程池时返回None
+
+    """
+    if max_workers <= 1 or _is_daemon_process():
+        return None
+
+    pool = ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_jieba_worker,
+    )
+    # 进程退出时关闭进程池，回收工作进程
+    atexit.register(pool.shutdown, wait=False, cancel_futures=True)
+    return pool
+
 
 @inject
 @dataclass
@@ -14,11 +77,14 @@ class JiebaService:
     """基于jieba分词库的关键词提取服务类。
 
     提供文本关键词提取功能，使用jieba的TF-IDF算法进行关键词分析。
-    在初始化时会设置停用词集，以提高关键词提取的准确性。
+    在初始化时会设置停用词集，以提高关键词提取的准确性，并提前加载jieba词典，
+    避免首次提取关键词时才加载词典造成的延迟。
     """
 
     def __init__(self) -> None:
         default_tfidf.stop_words = STOPWORD_SET
+        # 提前加载jieba词典，重复调用时jieba会直接返回
+        jieba.initialize()
 
     @classmethod
     def extract_keywords(cls, text: str, max_keyword_pre_chunk: int = 10) -> list[str]:
@@ -37,3 +103,55 @@ class JiebaService:
             sentence=text,
             topK=max_keyword_pre_chunk,
         )
+
+    @classmethod
+    def extract_query_keywords(cls, query: str, max_keywords: int = 10) -> list[str]:
+        """提取检索查询的关键词，相同查询的结果会在进程内缓存
+
+        检索查询通常较短且重复率高，缓存可避免重复分词；文档内容请使用extract_keywords，
+        避免大段文本占用缓存。
+
+        Args:
+            query (str): 检索查询文本
+            max_keywords (int, optional): 提取的最大关键词数量，默认为10
+
+        Returns:
+            list[str]: 返回提取的关键词列表，按重要性从高到低排序
+
+        """
+        return list(_extract_query_keywords(query, max_keywords))
+
+    @classmethod
+    def batch_extract_keywords(
+        cls,
+        texts: list[str],
+        max_keyword_pre_chunk: int = 10,
+    ) -> list[list[str]]:
+        """批量提取多个文本的关键词
+
+        文本数量较多时使用进程池并行提取，绕开GIL对CPU密集型分词的限制；
+        数量较少或不能使用进程池（如在Celery工作进程中）时直接在当前进程中串行提取。
+        进程池大小由JIEBA_PROCESS_POOL_SIZE配置。
+
+        Args:
+            texts (list[str]): 需要提取关键词的文本列表
+            max_keyword_pre_chunk (int, optional): 每个文本块提取的最大关键词数量，
+            默认为10
+
+        Returns:
+            list[list[str]]: 与输入文本一一对应的关键词列表
+
+        """
+        pool = None
+        if len(texts) >= PARALLEL_EXTRACT_THRESHOLD:
+            pool = _get_process_pool(current_app.config["JIEBA_PROCESS_POOL_SIZE"])
+        if pool is None:
+            return [cls.extract_keywords(text, max_keyword_pre_chunk) for text in texts]
+
+        return list(
+            pool.map(
+                partial(_extract_tags, top_k=max_keyword_pre_chunk),
+                texts,
+                chunksize=16,
+            ),
+        )
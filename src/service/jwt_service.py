@@ -1,11 +1,18 @@
 import os
 from dataclasses import dataclass
+from functools import cache
 from typing import Any
 
 import jwt
 from injector import inject
 
 
+@cache
+def _get_secret_key() -> bytes:
+    """读取并缓存JWT签名密钥，服务模块在加载环境变量前导入，因此延迟到首次使用时读取"""
+    return os.environ["JWT_SECRET_KEY"].encode()
+
+
 @inject
 @dataclass
 class JwtService:
@@ -20,9 +27,7 @@ class JwtService:
             str: 生成的JWT令牌字符串
 
         """
-        secret_key = os.getenv("JWT_SECRET_KEY")
-
-        return jwt.encode(payload, secret_key, algorithm="HS256")
+        return jwt.encode(payload, _get_secret_key(), algorithm="HS256")
 
     @classmethod
     def decode_token(cls, token: str) -> dict[str, Any]:
@@ -39,10 +44,8 @@ class JwtService:
             Exception: 其他解码过程中可能出现的异常
 
         """
-        secret_key = os.getenv("JWT_SECRET_KEY")
-
         try:
-            return jwt.decode(token, secret_key, algorithms=["HS256"])
+            return jwt.decode(token, _get_secret_key(), algorithms=["HS256"])
         except jwt.ExpiredSignatureError as e:
             error_msg = "授权认证已过期，请重新登录"
             raise ValueError(error_msg) from e
@@ -1,9 +1,12 @@
+import hashlib
 import logging
 import mimetypes
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
+import orjson
 from flask import current_app
 from injector import inject
 
@@ -18,6 +21,54 @@ from .base_service import BaseService
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=128)
+def _load_icon(icon_path: Path) -> tuple[bytes, str, str]:
+    """读取并缓存图标文件，返回(字节数据, mimetype, etag)
+
+    Note:
+        图标为静态资源，进程内只读取一次
+
+    """
+    # 1.检测icon是否存在
+    if not icon_path.exists():
+        error_msg = "该模型提供者_asset下未提供图标"
+        raise NotFoundException(error_msg)
+
+    # 2.读取icon的类型
+    mimetype, _ = mimetypes.guess_type(icon_path)
+    mimetype = mimetype or "application/octet-stream"
+
+    # 3.读取icon的字节数据并计算etag
+    byte_data = icon_path.read_bytes()
+    etag = hashlib.sha1(byte_data, usedforsecurity=False).hexdigest()
+
+    return byte_data, mimetype, etag
+
+
+@lru_cache(maxsize=256)
+def _create_language_model(
+    model_class: type[BaseLanguageModel],
+    model_kwargs_key: bytes,
+) -> BaseLanguageModel:
+    """根据模型类与序列化后的实例化参数创建并缓存大语言模型实例
+
+    同一应用的多次对话使用相同的模型配置，复用模型实例可以避免每次请求都重新构建HTTP客户端等资源，
+    缓存键包含全部实例化参数，配置变化时会自动创建新的实例
+    """
+    return model_class(**orjson.loads(model_kwargs_key))
+
+
+def _load_language_model(
+    model_class: type[BaseLanguageModel],
+    **kwargs: Any,
+) -> BaseLanguageModel:
+    """将实例化参数序列化为稳定的缓存键后获取模型实例"""
+    return _create_language_model(
+        model_class,
+        orjson.dumps(kwargs, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS),
+    )
+
+
 @inject
 @dataclass
 class LLMModelService(BaseService):
@@ -36,30 +87,8 @@ class LLMModelService(BaseService):
 
     def get_language_models(self) -> list[dict[str, Any]]:
         """获取LLMOps项目中的所有模型列表信息"""
-        # 1.调用语言模型管理器获取提供商列表
-        providers = self.llm_model_manager.get_providers()
-
-        # 2.构建语言模型列表，循环读取数据
-        language_models = []
-        for provider in providers:
-            # 3.获取提供商实体和模型实体列表
-            provider_entity = provider.provider_entity
-            model_entities = provider.get_model_entities()
-
-            # 4.构建响应字典结构
-            language_model = {
-                "name": provider_entity.name,
-                "position": provider.position,
-                "label": provider_entity.label,
-                "icon": provider_entity.icon,
-                "description": provider_entity.description,
-                "background": provider_entity.background,
-                "support_model_types": provider_entity.supported_model_types,
-                "models": convert_model_to_dict(model_entities),
-            }
-            language_models.append(language_model)
-
-        return language_models
+        # 1.模型列表在语言模型管理器中只构建一次，这里仅复制外层列表避免调用方修改快照
+        return list(self.llm_model_manager.language_models)
 
     def get_language_model(self, provider_name: str, model_name: str) -> dict[str, Any]:
         """根据传递的提供者名字+模型名字获取模型详细信息"""
@@ -77,8 +106,13 @@ class LLMModelService(BaseService):
 
         return convert_model_to_dict(model_entity)
 
-    def get_language_model_icon(self, provider_name: str) -> tuple[bytes, str]:
-        """根据传递的提供者名字获取提供商对应的图标信息"""
+    def get_language_model_icon(self, provider_name: str) -> tuple[bytes, str, str]:
+        """根据传递的提供者名字获取提供商对应的图标信息
+
+        Returns:
+            tuple[bytes, str, str]: 图标的(字节数据, mimetype, etag)
+
+        """
         # 1.获取提供者信息
         provider = self.llm_model_manager.get_provider(provider_name)
         if not provider:
@@ -93,22 +127,9 @@ class LLMModelService(BaseService):
             root_path / "src" / "core" / "llm_model" / "providers" / provider_name
         )
 
-        # 4.拼接得到icon对应的路径
+        # 4.拼接得到icon对应的路径，读取缓存的icon数据
         icon_path = provider_path / "_asset" / provider.provider_entity.icon
-
-        # 5.检测icon是否存在
-        if not icon_path.exists():
-            error_msg = "该模型提供者_asset下未提供图标"
-            raise NotFoundException(error_msg)
-
-        # 6.读取icon的类型
-        mimetype, _ = mimetypes.guess_type(icon_path)
-        mimetype = mimetype or "application/octet-stream"
-
-        # 7.读取icon的字节数据
-        with icon_path.open("rb") as f:
-            byte_data = f.read()
-            return byte_data, mimetype
+        return _load_icon(icon_path)
 
     def load_language_model(self, model_config: dict[str, Any]) -> BaseLanguageModel:
         """根据传递的模型配置加载大语言模型，并返回其实例"""
@@ -123,8 +144,9 @@ class LLMModelService(BaseService):
             model_entity = provider.get_model_entity(model_name)
             model_class = provider.get_model_class(model_entity.model_type)
 
-            # 3.实例化模型后并返回
-            return model_class(
+            # 3.实例化模型(相同配置复用缓存的实例)后并返回
+            return _load_language_model(
+                model_class,
                 **model_entity.attributes,
                 **parameters,
                 features=model_entity.features,
@@ -146,8 +168,9 @@ class LLMModelService(BaseService):
         # 需要替换成自定义封装的类，否则会识别到模型不存在features
         # return ChatOpenAI(model="gpt-4o-mini", temperature=1, max_tokens=8192)
 
-        # 2.实例化模型并返回
-        return model_class(
+        # 2.实例化模型(复用缓存的实例)并返回
+        return _load_language_model(
+            model_class,
             **model_entity.attributes,
             temperature=1,
             max_tokens=8192,
@@ -1,7 +1,8 @@
 import os
 import secrets
-import string
 from datetime import UTC, datetime, timedelta
+from functools import lru_cache
+from typing import Any
 
 from alibabacloud_dm20151123 import models as dm_20151123_models
 from alibabacloud_dm20151123.client import Client as Dm20151123Client
@@ -9,39 +10,112 @@ from alibabacloud_tea_openapi import models as open_api_models
 from alibabacloud_tea_util import models as util_models
 from injector import inject
 from redis import Redis
-from sqlalchemy import desc
+from sqlalchemy import delete, select, update
 
 from pkg.sqlalchemy.sqlalchemy import SQLAlchemy
 from src.exception.exception import FailException
 from src.model.account import VerificationCode
 from src.service.base_service import BaseService
+from src.task.mail_task import (
+    create_verification_code,
+    mark_mail_code_used,
+    send_verify_code_mail,
+)
+
+# 原子地占用发送限制并缓存验证码，发送限制已存在时不做任何修改并返回0
+_RESERVE_MAIL_CODE_SCRIPT = """
+if not redis.call("SET", KEYS[1], "1", "EX", 60, "NX") then
+    return 0
+end
+redis.call("SETEX", KEYS[2], 300, ARGV[1])
+return 1
+"""
+
+# 比较缓存的验证码，一致时在同一次往返中删除验证码缓存和发送限制记录，
+# 并写入与验证码有效期相同的已使用标记，供数据库回退校验时拒绝重复使用
+_CONSUME_MAIL_CODE_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    redis.call("DEL", KEYS[1], KEYS[2])
+    redis.call("SET", KEYS[3], "1", "EX", 300)
+    return 1
+end
+return 0
+"""
+
+
+# 清理过期验证码时单批删除的记录数量
+PURGE_BATCH_SIZE = 10000
+
+# 验证码邮件的正文模板
+_MAIL_TEXT_BODY_TEMPLATE = (
+    "你的验证码是 {verify_code}， 该验证码 5 分钟内有效，请勿泄露给他人"
+)
+
+
+@lru_cache(maxsize=1)
+def _get_mail_request_template() -> dict[str, Any]:
+    """构建并缓存验证码邮件请求中固定不变的参数"""
+    return {
+        # 发件人邮箱地址
+        "account_name": os.getenv("ALIBABA_CLOUD_EMAIL_ACCOUNT_NAME"),
+        # 1为发信人地址，0为回信地址
+        "address_type": 1,
+        # 不使用回信地址
+        "reply_to_address": False,
+        # 邮件主题
+        "subject": "虎子 · 邮箱验证码",
+    }
+
+
+@lru_cache(maxsize=1)
+def _get_dm_client() -> Dm20151123Client:
+    """创建并缓存阿里云邮件服务客户端，进程内所有请求复用同一个客户端"""
+    # 创建阿里云邮件服务配置对象
+    mail_config = open_api_models.Config(
+        # 从环境变量获取访问密钥ID
+        access_key_id=os.getenv("ALIBABA_CLOUD_ACCESS_KEY_ID"),
+        # 从环境变量获取访问密钥Secret
+        access_key_secret=os.getenv("ALIBABA_CLOUD_ACCESS_KEY_SECRET"),
+    )
+    # 设置阿里云邮件服务的端点地址
+    mail_config.endpoint = os.getenv("ALIBABA_CLOUD_EMAIL_ENDPOINT")
+    # 创建阿里云邮件服务客户端实例
+    return Dm20151123Client(mail_config)
 
 
 @inject
 class MailService(BaseService):
     redis_client: Redis
     db: SQLAlchemy
+    # 所有发送请求共用的运行时选项：限制连接与读取超时，保留空闲连接供后续请求复用，
+    # 并对瞬时错误自动重试一次
+    runtime = util_models.RuntimeOptions(
+        connect_timeout=2000,
+        read_timeout=5000,
+        max_idle_conns=64,
+        autoretry=True,
+        max_attempts=2,
+    )
 
     def __init__(self, redis_client: Redis, db: SQLAlchemy) -> None:
         # 初始化Redis客户端，用于缓存和限流
         self.redis_client = redis_client
         # 初始化数据库连接，用于存储验证码记录
         self.db = db
-        # 创建阿里云邮件服务配置对象
-        mail_config = open_api_models.Config(
-            # 从环境变量获取访问密钥ID
-            access_key_id=os.getenv("ALIBABA_CLOUD_ACCESS_KEY_ID"),
-            # 从环境变量获取访问密钥Secret
-            access_key_secret=os.getenv("ALIBABA_CLOUD_ACCESS_KEY_SECRET"),
+        # 获取复用的阿里云邮件服务客户端实例
+        self.client = _get_dm_client()
+        # 注册发送和校验验证码使用的Lua脚本
+        self.reserve_mail_code_script = redis_client.register_script(
+            _RESERVE_MAIL_CODE_SCRIPT,
+        )
+        self.consume_mail_code_script = redis_client.register_script(
+            _CONSUME_MAIL_CODE_SCRIPT,
         )
-        # 设置阿里云邮件服务的端点地址
-        mail_config.endpoint = os.getenv("ALIBABA_CLOUD_EMAIL_ENDPOINT")
-        # 创建阿里云邮件服务客户端实例
-        self.client = Dm20151123Client(mail_config)
 
     def generate_verification_code(self, length=6) -> str:
         """生成6位数字验证码"""
-        return "".join(secrets.choice(string.digits) for _ in range(length))
+        # 一次性均匀抽取0~10^length-1之间的随机数，并在左侧补零到指定长度
+        return f"{secrets.randbelow(10**length):0{length}d}"
 
     def send_mail_verify_code(self, email: str) -> str:
         """发送邮箱验证码
@@ -53,61 +127,80 @@ class MailService(BaseService):
             str: 生成的6位验证码
 
         Raises:
-            FailException: 当验证码发送过于频繁或发送失败时抛出
+            FailException: 当验证码发送过于频繁时抛出
 
         Note:
             - 验证码有效期为5分钟
             - 同一邮箱60秒内只能发送一次验证码
-            - 使用阿里云邮件服务发送验证码
+            - 验证码缓存在Redis中，数据库记录与邮件通过Celery异步任务写入和发送
 
         """
-        # 检查Redis中是否存在该邮箱的发送限制记录
-        if self.redis_client.exists(f"mail_limit:{email}"):
+        # 生成6位随机验证码
+        verify_code = self.generate_verification_code()
+
+        # 使用Lua脚本原子地占用该邮箱60秒的发送限制，并在Redis中缓存5分钟的验证码，
+        # 校验时以缓存为准，不依赖数据库记录是否已写入；占用失败说明发送过于频繁
+        if not self.reserve_mail_code_script(
+            keys=[f"mail_limit:{email}", f"mail_code:{email}"],
+            args=[verify_code],
+        ):
             error_msg = "验证码发送过于频繁，请稍后再试"
             raise FailException(error_msg)
 
-        # 生成6位随机验证码
-        verify_code = self.generate_verification_code()
+        # 投递异步任务写入验证码记录并发送验证码邮件，不阻塞当前请求
+        create_verification_code.delay(
+            email,
+            verify_code,
+            datetime.now(UTC) + timedelta(minutes=5),  # 设置5分钟后过期
+        )
+        send_verify_code_mail.delay(email, verify_code)
+
+        return verify_code
+
+    def create_verification_code(
+        self,
+        email: str,
+        verify_code: str,
+        expires_at: datetime,
+    ) -> VerificationCode:
+        """将验证码信息保存到数据库
+
+        Args:
+            email (str): 验证码对应的邮箱地址
+            verify_code (str): 生成的验证码
+            expires_at (datetime): 验证码的过期时间
+
+        Returns:
+            VerificationCode: 创建的验证码记录
+
+        """
+        return self.create(
+            VerificationCode,
+            account=email,  # 邮箱账号
+            code=verify_code,  # 验证码
+            expires_at=expires_at,  # 过期时间
+        )
 
-        # 构建阿里云邮件服务请求对象
+    def send_verify_code_mail(self, email: str, verify_code: str) -> None:
+        """调用阿里云邮件服务发送验证码邮件
+
+        Args:
+            email (str): 接收验证码的邮箱地址
+            verify_code (str): 需要发送的验证码
+
+        """
+        # 基于固定的请求参数构建阿里云邮件服务请求对象，只填充收件人和正文
         send_mail_verify_code_request = dm_20151123_models.SingleSendMailRequest(
-            account_name=os.getenv(
-                "ALIBABA_CLOUD_EMAIL_ACCOUNT_NAME",
-            ),  # 发件人邮箱地址
-            address_type=1,  # 1为发信人地址，0为回信地址
-            reply_to_address=False,  # 不使用回信地址
-            subject="虎子 · 邮箱验证码",  # 邮件主题
+            **_get_mail_request_template(),
             to_address=email,  # 收件人邮箱
-            text_body=(  # 邮件正文内容
-                f"你的验证码是 {verify_code}， 该验证码 5 分钟内有效，请勿泄露给他人"
-            ),
+            text_body=_MAIL_TEXT_BODY_TEMPLATE.format(verify_code=verify_code),
         )
 
-        # 创建运行时选项对象
-        runtime = util_models.RuntimeOptions()
-        try:
-            # 调用阿里云邮件服务发送验证码邮件
-            self.client.single_send_mail_with_options(
-                send_mail_verify_code_request,
-                runtime,
-            )
-            # 将验证码信息保存到数据库
-            self.create(
-                VerificationCode,
-                account=email,  # 邮箱账号
-                code=verify_code,  # 验证码
-                expires_at=datetime.now(UTC) + timedelta(minutes=5),  # 设置5分钟后过期
-            )
-
-            # 在Redis中设置60秒的发送限制
-            self.redis_client.setex(f"mail_limit:{email}", "1", 60)
-        except Exception as e:
-            # 如果发送过程中出现异常，抛出业务异常
-            error_msg = f"验证码发送失败: {e!s}"
-            raise FailException(error_msg) from e
-        else:
-            # 发送成功，返回验证码
-            return verify_code
+        # 调用阿里云邮件服务发送验证码邮件
+        self.client.single_send_mail_with_options(
+            send_mail_verify_code_request,
+            self.runtime,
+        )
 
     def verify_mail_code(self, email, verify_code) -> bool:
         """验证邮箱验证码
@@ -123,32 +216,100 @@ class MailService(BaseService):
             FailException: 当验证码不存在、错误或已过期时抛出异常
 
         """
-        # 查询最新的未使用的验证码记录
-        code_record = (
-            self.db.session.query(VerificationCode)
-            .filter_by(
-                account=email,
-                code=verify_code,
-                used=False,
-            )
-            .order_by(desc(VerificationCode.created_at))
-            .first()
-        )
+        # 优先使用Redis中缓存的验证码校验，校验通过时原子地删除验证码缓存和发送限制，
+        # 并留下已使用标记，随后异步将数据库中的验证码标记为已使用
+        consumed_key = f"mail_code_consumed:{email}:{verify_code}"
+        if self.consume_mail_code_script(
+            keys=[f"mail_code:{email}", f"mail_limit:{email}", consumed_key],
+            args=[verify_code],
+        ):
+            mark_mail_code_used.delay(email, verify_code)
+            return True
 
-        # 检查验证码是否存在
-        if not code_record:
+        # 数据库记录在异步任务执行前仍为未使用状态，已通过Redis使用过的验证码
+        # 不能再经由数据库回退校验通过，Redis中的已使用标记优先于数据库记录
+        if self.redis_client.exists(consumed_key):
             error_msg = "验证码错误或不存在"
             raise FailException(error_msg)
 
-        # 检查验证码是否过期
-        if not code_record.is_valid:
-            error_msg = "验证码已过期"
+        # 缓存不存在或不一致时回退到数据库，使用一条UPDATE ... RETURNING原子地消费
+        # 未使用且未过期的验证码，used条件需与部分索引的谓词保持一致
+        conditions = (
+            VerificationCode.account == email,
+            VerificationCode.code == verify_code,
+            VerificationCode.used.is_(False),
+        )
+        with self.db.auto_commit():
+            code_record = self.db.session.execute(
+                update(VerificationCode)
+                .where(*conditions, VerificationCode.expires_at > datetime.now(UTC))
+                .values(used=True)
+                .returning(VerificationCode.id),
+            ).first()
+
+        if code_record is None:
+            # 消费失败时再检查一次未使用的验证码是否存在，以区分验证码错误和已过期
+            if self.db.session.scalar(
+                select(VerificationCode.id).where(*conditions).limit(1),
+            ):
+                error_msg = "验证码已过期"
+                raise FailException(error_msg)
+            error_msg = "验证码错误或不存在"
             raise FailException(error_msg)
 
-        # 标记验证码为已使用
-        if code_record.mark_as_used():  # 确保方法正确执行并检查返回值
-            # 验证成功后删除Redis中的邮件发送限制记录
-            self.redis_client.delete(f"mail_limit:{email}")
-            return True
-        error_msg = "验证码标记失败"
-        raise FailException(error_msg)
+        # 验证成功后使用管道一次性删除Redis中的发送限制和验证码缓存
+        with self.redis_client.pipeline(transaction=False) as pipe:
+            pipe.delete(f"mail_limit:{email}")
+            pipe.delete(f"mail_code:{email}")
+            pipe.execute()
+        return True
+
+    def mark_mail_code_used(self, email: str, verify_code: str) -> int:
+        """将指定邮箱下未使用的验证码标记为已使用
+
+        Args:
+            email (str): 验证码对应的邮箱地址
+            verify_code (str): 已通过校验的验证码
+
+        Returns:
+            int: 被标记为已使用的记录数量
+
+        """
+        with self.db.auto_commit():
+            result = self.db.session.execute(
+                update(VerificationCode)
+                .where(
+                    VerificationCode.account == email,
+                    VerificationCode.code == verify_code,
+                    VerificationCode.used.is_(False),
+                )
+                .values(used=True),
+            )
+
+        return result.rowcount
+
+    def purge_expired_verification_codes(self) -> int:
+        """分批删除过期超过1天的验证码记录（包含邮箱和短信验证码）
+
+        Returns:
+            int: 删除的记录总数
+
+        """
+        expired_before = datetime.now(UTC) - timedelta(days=1)
+        total = 0
+        while True:
+            # 每批只删除有限数量的记录，避免长时间持有锁
+            with self.db.auto_commit():
+                result = self.db.session.execute(
+                    delete(VerificationCode).where(
+                        VerificationCode.id.in_(
+                            select(VerificationCode.id)
+                            .where(VerificationCode.expires_at < expired_before)
+                            .limit(PURGE_BATCH_SIZE),
+                        ),
+                    ),
+                    execution_options={"synchronize_session": False},
+                )
+            total += result.rowcount
+            if result.rowcount < PURGE_BATCH_SIZE:
+                return total
@@ -1,6 +1,7 @@
 import os
 from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
+from functools import cache
 from typing import Any
 
 from flask import request
@@ -17,6 +18,27 @@ from src.service.base_service import BaseService
 from src.service.jwt_service import JwtService
 
 
+@cache
+def _build_all_oauth() -> dict[str, OAuth]:
+    """根据环境变量构建并缓存所有OAuth提供商实例"""
+    # 创建GitHub OAuth实例
+    # 从环境变量中获取GitHub OAuth所需的配置信息
+    github = GithubOAuth(
+        client_id=os.getenv("GITHUB_CLIENT_ID"),  # GitHub应用的客户端ID
+        client_secret=os.getenv("GITHUB_CLIENT_SECRET"),  # GitHub应用的客户端密钥
+        redirect_uri=os.getenv("GITHUB_REDIRECT_URL"),  # OAuth回调URL
+    )
+
+    wechat = WechatOAuth(
+        client_id=os.getenv("YUNGOUOS_MCH_ID"),
+        client_secret=os.getenv("YUNGOUOS_KEY"),
+        redirect_uri=os.getenv("WX_CALLBACK_URL"),
+    )
+
+    # 返回包含所有OAuth提供商的字典
+    return {"github": github, "wxmp": wechat}
+
+
 @inject
 @dataclass
 class OAuthService(BaseService):
@@ -33,22 +55,8 @@ class OAuthService(BaseService):
             键为提供商名称，值为OAuth实例
 
         """
-        # 创建GitHub OAuth实例
-        # 从环境变量中获取GitHub OAuth所需的配置信息
-        github = GithubOAuth(
-            client_id=os.getenv("GITHUB_CLIENT_ID"),  # GitHub应用的客户端ID
-            client_secret=os.getenv("GITHUB_CLIENT_SECRET"),  # GitHub应用的客户端密钥
-            redirect_uri=os.getenv("GITHUB_REDIRECT_URL"),  # OAuth回调URL
-        )
-
-        wechat = WechatOAuth(
-            client_id=os.getenv("YUNGOUOS_MCH_ID"),
-            client_secret=os.getenv("YUNGOUOS_KEY"),
-            redirect_uri=os.getenv("WX_CALLBACK_URL"),
-        )
-
-        # 返回包含所有OAuth提供商的字典
-        return {"github": github, "wxmp": wechat}
+        # OAuth配置在进程内保持不变，直接复用缓存的提供商实例
+        return _build_all_oauth()
 
     @classmethod
     def get_oauth_by_provider_name(cls, provider_name: str) -> OAuth:
@@ -164,17 +172,17 @@ class OAuthService(BaseService):
         # 使用访问令牌获取用户信息
         oauth_user_info = oauth.get_user_info(oauth_access_token)
 
-        # 查找是否已存在该OAuth账户绑定
-        account_oauth = (
-            self.account_service.get_account_oauth_by_provider_name_and_openid(
-                provider_name,
-                oauth_user_info.id,
-            )
+        # 使用一次联表查询获取已存在的OAuth账户绑定及其关联的账户信息
+        account_with_oauth = self.account_service.get_account_with_oauth(
+            provider_name,
+            oauth_user_info.id,
         )
 
-        # 如果不存在OAuth账户绑定，则创建新账户或绑定到现有账户
-        if not account_oauth:
-            # 尝试通过邮箱查找现有账户
+        if account_with_oauth:
+            account, account_oauth = account_with_oauth
+        else:
+            # 如果不存在OAuth账户绑定，则创建新账户或绑定到现有账户，
+            # 先尝试通过邮箱查找现有账户
             account = None
             if oauth_user_info.email:
                 account = self.account_service.get_account_by_email(
@@ -195,30 +203,19 @@ class OAuthService(BaseService):
                     "is_new_user": True,
                 }
 
-            # 创建OAuth账户绑定
-            account_oauth = self.create(
-                AccountOAuth,
+            # 构建OAuth账户绑定，与登录信息的更新在同一事务中提交
+            account_oauth = AccountOAuth(
                 account_id=account.id,
                 provider=provider_name,
                 openid=oauth_user_info.id,
-                encrypted_token=oauth_access_token,
             )
-        else:
-            # 如果已存在OAuth绑定，获取关联的账户信息
-            account = self.account_service.get_account(account_oauth.account_id)
-
-        # 更新账户的最后登录时间和IP地址
-        self.update(
-            account,
-            last_login_at=datetime.now(UTC),
-            last_login_ip=request.remote_addr,
-        )
 
-        # 更新OAuth账户的访问令牌
-        self.update(
-            account_oauth,
-            encrypted_token=oauth_access_token,
-        )
+        # 在一次事务中保存OAuth账户绑定、更新访问令牌以及账户的最后登录时间和IP地址
+        with self.db.auto_commit():
+            self.db.session.add(account_oauth)
+            account_oauth.encrypted_token = oauth_access_token
+            account.last_login_at = datetime.now(UTC)
+            account.last_login_ip = request.remote_addr
 
         # 设置JWT令牌的过期时间为30天后
         expire_at = int((datetime.now(UTC) + timedelta(days=30)).timestamp())
@@ -1,10 +1,13 @@
-import json
+import contextlib
+import hashlib
 from collections.abc import Generator
 from dataclasses import dataclass
 
+import orjson
 from flask import current_app
 from injector import inject
 from langchain_community.tools import Tool
+from redis import Redis, RedisError
 
 from pkg.response.response import Response
 from pkg.sqlalchemy.sqlalchemy import SQLAlchemy
@@ -12,9 +15,10 @@ from src.core.agent.agents.function_call_agent import FunctionCallAgent
 from src.core.agent.agents.react_agent import ReACTAgent
 from src.core.agent.entities.agent_entity import AgentConfig
 from src.core.agent.entities.queue_entity import AgentThought, QueueEvent
-from src.core.llm_model.entities.model_entity import BaseLanguageModel, ModelFeature
+from src.core.llm_model.entities.model_entity import BaseLanguageModel
 from src.core.memory.token_buffer_memory import TokenBufferMemory
 from src.entity.app_entity import AppStatus
+from src.entity.cache_entity import PROMPT_CACHE_EXPIRE_TIME, PROMPT_CACHE_KEY
 from src.entity.conversation_entity import InvokeFrom, MessageStatus
 from src.entity.dataset_entity import RetrievalSource
 from src.exception.exception import ForbiddenException, NotFoundException
@@ -30,6 +34,11 @@ from src.service.conversation_service import AgentThoughtConfig, ConversationSer
 from src.service.llm_model_service import LLMModelService
 from src.service.retrieval_service import RetrievalConfig, RetrievalService
 
+# 每种事件类型对应的SSE帧前缀，避免每个token都重新格式化事件名称
+_SSE_EVENT_PREFIXES = {
+    event: f"event: {event.value}\ndata:".encode() for event in QueueEvent
+}
+
 
 @dataclass
 class OpenAPIServiceConfig:
@@ -39,6 +48,7 @@ class OpenAPIServiceConfig:
     message: Message
     app_config: dict
     account: Account
+    prompt_cache_key: str | None = None
 
 
 @inject
@@ -61,10 +71,12 @@ class OpenAPIService(BaseService):
         app_service: 应用服务
         retrieval_service: 检索服务
         conversation_service: 会话服务
+        redis_client: Redis客户端，用于存储非流式对话的提示缓存
 
     """
 
     db: SQLAlchemy
+    redis_client: Redis
     app_config_service: AppConfigService
     app_service: AppService
     retrieval_service: RetrievalService
@@ -78,9 +90,10 @@ class OpenAPIService(BaseService):
         - 1.验证应用和获取配置
         - 2.获取或创建用户和会话
         - 3.创建消息记录
-        - 4.配置语言模型(LLM)和工具
-        - 5.配置智能体
-        - 6.根据请求类型执行流式或非流式响应
+        - 4.非流式请求查询提示缓存，命中时直接返回缓存的回答
+        - 5.配置语言模型(LLM)和工具
+        - 6.配置智能体
+        - 7.根据请求类型执行流式或非流式响应
 
         Args:
             req (OpenAPIChatReq): 聊天请求对象，包含消息内容、流式请求标志等
@@ -105,13 +118,26 @@ class OpenAPIService(BaseService):
         # 在数据库中创建用户输入的消息记录，用于后续追踪和上下文管理
         message = self._create_message(req, app, conversation, end_user)
 
-        # 4. 配置语言模型(LLM)和工具
+        # 4. 查询提示缓存
+        # 仅对开启缓存、温度为0的非流式单轮对话生效，命中时跳过智能体的执行
+        prompt_cache_key = None
+        if not req.stream.data:
+            prompt_cache_key = self._get_prompt_cache_key(req, app, app_config)
+            cached_response = self._get_cached_response(
+                prompt_cache_key,
+                conversation,
+                message,
+            )
+            if cached_response is not None:
+                return cached_response
+
+        # 5. 配置语言模型(LLM)和工具
         # 根据应用配置初始化语言模型实例
         # 配置并初始化智能体可用的工具列表（如知识库检索等）
-        llm = self._configure_llm(app_config)
+        llm = self._configure_llm(app_config.get("model_config", {}))
         tools = self._configure_tools(app_config, account)
 
-        # 5. 配置智能体
+        # 6. 配置智能体
         # 创建智能体实例并初始化其状态，包括记忆和上下文
         agent, agent_state = self._configure_agent(
             req,
@@ -121,30 +147,108 @@ class OpenAPIService(BaseService):
             conversation,
         )
 
-        # 6. 执行智能体并返回结果
+        # 7. 执行智能体并返回结果
         # 根据请求中的stream标志决定使用流式响应还是非流式响应
         # 流式响应：实时返回智能体的思考过程和回答
         # 非流式响应：等待完整回答后一次性返回结果
+        service_config = OpenAPIServiceConfig(
+            agent=agent,
+            agent_state=agent_state,
+            conversation=conversation,
+            message=message,
+            app_config=app_config,
+            account=account,
+            prompt_cache_key=prompt_cache_key,
+        )
         if req.stream.data:
-            return self._handle_streaming_response(
-                OpenAPIServiceConfig(
-                    agent=agent,
-                    agent_state=agent_state,
-                    conversation=conversation,
-                    message=message,
-                    app_config=app_config,
-                    account=account,
-                ),
-            )
-        return self._handle_non_streaming_response(
-            OpenAPIServiceConfig(
-                agent=agent,
-                agent_state=agent_state,
-                conversation=conversation,
-                message=message,
-                app_config=app_config,
-                account=account,
+            return self._handle_streaming_response(service_config)
+        return self._handle_non_streaming_response(service_config)
+
+    def _get_prompt_cache_key(
+        self,
+        req: OpenAPIChatReq,
+        app: App,
+        app_config: dict,
+    ) -> str | None:
+        """计算非流式对话的精确匹配提示缓存键
+
+        Args:
+            req: OpenAPI聊天请求对象，包含查询内容和图片
+            app: 当前应用对象
+            app_config: 应用配置字典
+
+        Returns:
+            str | None: 缓存键，当前请求不满足缓存条件时返回None
+
+        Note:
+            - 只有应用配置开启了回答缓存(prompt_cache)且模型温度为0时才会缓存，
+              保证回答的确定性
+            - 携带会话ID的请求会受历史对话和长期记忆影响，不进行缓存
+
+        """
+        if not app_config["prompt_cache"]["enable"] or req.conversation_id.data:
+            return None
+        if app_config["model_config"].get("parameters", {}).get("temperature") != 0:
+            return None
+
+        # 应用配置(模型、预设提示、工具、知识库等)与用户输入共同决定回答内容
+        prompt_hash = hashlib.sha256(
+            orjson.dumps(
+                {
+                    "app_id": app.id,
+                    "app_config": app_config,
+                    "query": req.query.data,
+                    "image_urls": req.image_urls.data,
+                },
+                option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
             ),
+        ).hexdigest()
+        return PROMPT_CACHE_KEY.format(prompt_hash=prompt_hash)
+
+    def _get_cached_response(
+        self,
+        prompt_cache_key: str | None,
+        conversation: Conversation,
+        message: Message,
+    ) -> Response | None:
+        """根据提示缓存键获取缓存的回答并构建响应
+
+        Args:
+            prompt_cache_key: 提示缓存键，为None时表示不使用缓存
+            conversation: 当前会话对象
+            message: 当前消息对象，命中缓存时会写入缓存的回答
+
+        Returns:
+            Response | None: 命中缓存时返回响应对象，否则返回None
+
+        """
+        if prompt_cache_key is None:
+            return None
+
+        # 缓存读取失败时退化为正常调用智能体
+        try:
+            cached_answer = self.redis_client.get(prompt_cache_key)
+        except RedisError:
+            return None
+        if cached_answer is None:
+            return None
+
+        # 命中缓存时同样持久化消息的回答，保证会话记录完整
+        answer = cached_answer.decode()
+        self.update(message, answer=answer, latency=0)
+
+        return Response(
+            data={
+                "id": str(message.id),
+                "end_user_id": str(conversation.created_by),
+                "conversation_id": str(conversation.id),
+                "query": message.query,
+                "image_urls": message.image_urls,
+                "answer": answer,
+                "total_token_count": 0,
+                "latency": 0,
+                "agent_thoughts": [],
+            },
         )
 
     def _validate_and_get_app(
@@ -298,17 +402,16 @@ class OpenAPIService(BaseService):
             status=MessageStatus.NORMAL,
         )
 
-    def _configure_llm(self, app_config: dict) -> BaseLanguageModel:
+    def _configure_llm(self, model_config: dict) -> BaseLanguageModel:
         """配置并初始化ChatOpenAI模型实例
 
         根据应用配置中的模型参数创建并返回一个ChatOpenAI实例。
         该实例将用于后续的对话处理和智能体交互。
 
         Args:
-            app_config (dict): 应用配置字典，包含模型配置信息
-                - model_config: 模型配置部分
-                    - model: 使用的模型名称（如gpt-3.5-turbo等）
-                    - parameters: 模型参数配置字典，包含温度、top_p等参数
+            model_config (dict): 应用配置中的模型配置部分
+                - model: 使用的模型名称（如gpt-3.5-turbo等）
+                - parameters: 模型参数配置字典，包含温度、top_p等参数
 
         Returns:
             ChatOpenAI: 配置好的ChatOpenAI模型实例，可用于对话生成
@@ -318,9 +421,7 @@ class OpenAPIService(BaseService):
             - 具体支持的参数请参考ChatOpenAI官方文档
 
         """
-        return self.llm_model_service.load_language_model(
-            app_config.get("model_config", {}),
-        )
+        return self.llm_model_service.load_language_model(model_config)
 
     def _configure_tools(self, app_config: dict, account: Account) -> list[Tool]:
         """配置工具列表
@@ -342,15 +443,21 @@ class OpenAPIService(BaseService):
         # 检查是否配置了知识库
         # 如果配置了知识库，则创建检索工具并添加到工具列表中
         # 检索工具允许智能体能够查询和利用知识库中的信息
-        if app_config["datasets"]:
-            retrieval_tool = self._create_retrieval_tool(app_config, account)
+        datasets = app_config["datasets"]
+        if datasets:
+            retrieval_tool = self._create_retrieval_tool(
+                datasets,
+                app_config["retrieval_config"],
+                account,
+            )
             tools.append(retrieval_tool)
 
         # 检测是否关联工作流，如果关联了工作流则将工作流构建成工具添加到tools中
-        if app_config["workflows"]:
+        workflows = app_config["workflows"]
+        if workflows:
             workflow_tools = (
                 self.app_config_service.get_langchain_tools_by_workflow_ids(
-                    [workflow["id"] for workflow in app_config["workflows"]],
+                    [workflow["id"] for workflow in workflows],
                 )
             )
             tools.extend(workflow_tools)
@@ -358,39 +465,40 @@ class OpenAPIService(BaseService):
         # 返回配置完成的工具列表
         return tools
 
-    def _create_retrieval_tool(self, app_config: dict, account: Account) -> Tool:
+    def _create_retrieval_tool(
+        self,
+        datasets: list[dict],
+        retrieval_config: dict,
+        account: Account,
+    ) -> Tool:
         """创建用于知识库检索的LangChain工具。
 
         该方法根据应用配置和账户信息创建一个检索工具，该工具可以被智能体调用进行知识库检索。
         它会从应用配置中提取知识库ID和检索参数，构建检索配置对象，然后使用检索服务创建LangChain工具。
 
         Args:
-            app_config (dict): 应用配置字典，包含知识库信息和检索配置
-                - datasets: 知识库列表，每个知识库包含id字段
-                - retrieval_config: 检索相关配置参数
+            datasets (list[dict]): 应用配置中的知识库列表，每个知识库包含id字段
+            retrieval_config (dict): 应用配置中的检索相关配置参数
             account (Account): 账户对象，包含账户ID等信息
 
         Returns:
             Tool: 可被智能体调用的LangChain检索工具
 
-        Raises:
-            KeyError: 当app_config中缺少必要的配置项时
-
         """
         # 创建检索配置对象，配置知识库检索的相关参数
-        retrieval_config = RetrievalConfig(
+        search_config = RetrievalConfig(
             flask_app=current_app._get_current_object(),  # noqa: SLF001
             dataset_ids=[
-                dataset["id"] for dataset in app_config["datasets"]
+                dataset["id"] for dataset in datasets
             ],  # 从应用配置中提取所有知识库ID
             account_id=account.id,  # 设置当前操作的账户ID
             retrieval_source=RetrievalSource.APP,  # 指定检索来源为应用配置的知识库
-            **app_config["retrieval_config"],  # 展开应用配置中的检索相关配置参数
+            **retrieval_config,  # 展开应用配置中的检索相关配置参数
         )
 
         # 使用检索服务创建LangChain工具，该工具可以被智能体调用进行知识检索
         return self.retrieval_service.create_langchain_tool_from_search(
-            retrieval_config,
+            search_config,
         )
 
     def _configure_agent(
@@ -433,9 +541,7 @@ class OpenAPIService(BaseService):
         # 根据LLM模型特性选择合适的Agent类：
         # - 如果模型支持工具调用功能，使用FunctionCallAgent
         # - 否则使用ReACTAgent
-        agent_class = (
-            FunctionCallAgent if ModelFeature.TOOL_CALL in llm.features else ReACTAgent
-        )
+        agent_class = FunctionCallAgent if llm.supports_tool_call else ReACTAgent
         # 创建FunctionCallAgent实例
         agent = agent_class(
             name="debug_agent",
@@ -478,57 +584,48 @@ class OpenAPIService(BaseService):
             config (OpenAPIServiceConfig): 包含处理流式响应所需的所有配置信息，
                 包括智能体、会话、消息、应用配置和账户信息等
 
-        Returns:
-            Generator: 返回一个生成器对象，用于流式输出智能体的思考过程
+        Yields:
+            bytes: SSE格式的事件字节串，包含智能体的思考记录
 
         """
-        # 初始化智能体思考记录字典，用于存储流式处理过程中的思考记录
+        # 初始化智能体思考记录字典，用于存储流式处理过程中的思考记录及内容缓冲区
         agent_thoughts_dict = {}
 
-        def handle_stream() -> Generator:
-            """内部生成器函数，用于处理流式输出的每个思考记录
-
-            遍历智能体的流式输出，为每个思考记录生成事件ID，
-            更新思考记录字典，并生成SSE格式的事件。
-
-            Yields:
-                str: SSE格式的事件字符串，包含智能体的思考记录
+        # 会话ID与消息ID在整个流式输出中不变，提前转换为字符串避免逐个事件重复转换
+        conversation_id = str(config.conversation.id)
+        message_id = str(config.message.id)
 
-            """
-            # 遍历智能体的流式输出，每个元素是一个AgentThought对象
-            for agent_thought in config.agent.stream(config.agent_state):
-                # 生成事件ID，用于标识和关联思考记录
-                event_id = str(agent_thought.id)
+        # 遍历智能体的流式输出，每个元素是一个AgentThought对象
+        for agent_thought in config.agent.stream(config.agent_state):
+            # 生成事件ID，用于标识和关联思考记录
+            event_id = str(agent_thought.id)
 
-                # 如果不是心跳事件，则更新智能体思考记录字典
-                if agent_thought.event != QueueEvent.PING:
-                    self._update_agent_thoughts(
-                        agent_thoughts_dict,
-                        agent_thought,
-                        event_id,
-                    )
-
-                # 生成并返回SSE（Server-Sent Events）格式的事件
-                # SSE用于服务器向客户端推送实时数据
-                yield self._generate_sse_event(
+            # 如果不是心跳事件，则更新智能体思考记录字典
+            if agent_thought.event != QueueEvent.PING:
+                self._update_agent_thoughts(
+                    agent_thoughts_dict,
                     agent_thought,
                     event_id,
-                    config.conversation,
-                    config.message,
                 )
 
-            # 流式处理完成后，异步保存所有智能体思考记录
-            # 使用异步保存可以避免阻塞主流程，提高响应速度
-            self._save_agent_thoughts_async(
-                agent_thoughts_dict,
-                config.conversation,
-                config.message,
-                config.app_config,
-                config.account,
+            # 生成并返回SSE（Server-Sent Events）格式的事件
+            # SSE用于服务器向客户端推送实时数据
+            yield self._generate_sse_event(
+                agent_thought,
+                event_id,
+                conversation_id,
+                message_id,
             )
 
-        # 返回生成器对象，用于流式输出
-        return handle_stream()
+        # 流式处理完成后，异步保存所有智能体思考记录
+        # 使用异步保存可以避免阻塞主流程，提高响应速度
+        self._save_agent_thoughts_async(
+            self._merge_agent_thoughts(agent_thoughts_dict),
+            config.conversation,
+            config.message,
+            config.app_config,
+            config.account,
+        )
 
     def _handle_non_streaming_response(self, config: OpenAPIServiceConfig) -> Response:
         """处理非流式响应"""
@@ -547,6 +644,19 @@ class OpenAPIService(BaseService):
             config.account,  # 账户信息
         )
 
+        # 正常结束的回答写入提示缓存，缓存写入失败不影响本次响应
+        if (
+            config.prompt_cache_key is not None
+            and agent_result.status == MessageStatus.NORMAL
+            and agent_result.answer
+        ):
+            with contextlib.suppress(RedisError):
+                self.redis_client.setex(
+                    config.prompt_cache_key,
+                    PROMPT_CACHE_EXPIRE_TIME,
+                    agent_result.answer,
+                )
+
         # 构建并返回响应数据
         return Response(
             data={
@@ -566,96 +676,111 @@ class OpenAPIService(BaseService):
 
     def _update_agent_thoughts(
         self,
-        agent_thoughts_dict: dict,  # 存储智能体思考记录的字典
+        agent_thoughts_dict: dict,  # 存储智能体思考记录及其内容缓冲区的字典
         agent_thought: AgentThought,  # 新的智能体思考记录
         event_id: str,  # 事件ID，用于标识和关联思考记录
     ) -> None:
         """更新智能体思考记录
 
         根据事件类型更新智能体思考记录：
-        - 对于消息事件（AGENT_MESSAGE），合并思考过程和答案
+        - 对于消息事件（AGENT_MESSAGE），将思考过程和答案片段追加到缓冲区
         - 对于其他事件，直接存储新的思考记录
 
         Args:
-            agent_thoughts_dict: 存储智能体思考记录的字典，key为event_id
+            agent_thoughts_dict: 存储智能体思考记录的字典，key为event_id，
+                value为(思考记录, 思考片段列表, 答案片段列表)
             agent_thought: 新的智能体思考记录对象
             event_id: 事件ID，用于标识和关联思考记录
 
+        Note:
+            流式输出时每个token都会触发一次消息事件，逐次拼接字符串会导致
+            O(n²)的复制开销，因此先将片段追加到列表中，
+            待流式输出结束后再由_merge_agent_thoughts统一拼接
+
         """
-        # 处理消息事件
-        if agent_thought.event == QueueEvent.AGENT_MESSAGE:
-            # 如果事件ID不存在于字典中，直接添加新记录
-            if event_id not in agent_thoughts_dict:
-                agent_thoughts_dict[event_id] = agent_thought
-            else:
-                # 如果事件已存在，合并思考过程和答案
-                # 使用model_copy创建新对象，并更新以下字段：
-                # - thought: 合并原有的思考过程和新的思考过程
-                # - answer: 合并原有的答案和新的答案
-                # - latency: 使用新的延迟时间
-                agent_thoughts_dict[event_id] = agent_thoughts_dict[
-                    event_id
-                ].model_copy(
-                    update={
-                        "thought": agent_thoughts_dict[event_id].thought
-                        + agent_thought.thought,  # 合并思考过程
-                        "answer": agent_thoughts_dict[event_id].answer
-                        + agent_thought.answer,  # 合并答案内容
-                        "latency": agent_thought.latency,  # 更新延迟时间
-                    },
-                )
+        # 处理已存在的消息事件，追加思考过程和答案片段并更新延迟时间
+        # 只对字典做一次查找，合并分支直接复用查找结果
+        existing = (
+            agent_thoughts_dict.get(event_id)
+            if agent_thought.event == QueueEvent.AGENT_MESSAGE
+            else None
+        )
+        if existing is not None:
+            stored_thought, thought_parts, answer_parts = existing
+            thought_parts.append(agent_thought.thought)
+            answer_parts.append(agent_thought.answer)
+            stored_thought.latency = agent_thought.latency
         else:
-            # 对于非消息事件，直接存储新的思考记录
-            agent_thoughts_dict[event_id] = agent_thought
+            # 新的消息事件或非消息事件，直接存储新的思考记录并初始化缓冲区
+            agent_thoughts_dict[event_id] = (
+                agent_thought,
+                [agent_thought.thought],
+                [agent_thought.answer],
+            )
+
+    def _merge_agent_thoughts(self, agent_thoughts_dict: dict) -> list[AgentThought]:
+        """将缓冲区中的思考过程和答案片段一次性拼接回思考记录
+
+        Args:
+            agent_thoughts_dict: 由_update_agent_thoughts维护的思考记录字典
+
+        Returns:
+            list[AgentThought]: 合并后的智能体思考记录列表
+
+        """
+        agent_thoughts = []
+        for agent_thought, thought_parts, answer_parts in agent_thoughts_dict.values():
+            agent_thought.thought = "".join(thought_parts)
+            agent_thought.answer = "".join(answer_parts)
+            agent_thoughts.append(agent_thought)
+        return agent_thoughts
 
     def _generate_sse_event(
         self,
         agent_thought: AgentThought,
         event_id: str,
-        conversation: Conversation,
-        message: Message,
-    ) -> tuple[str, str]:
+        conversation_id: str,
+        message_id: str,
+    ) -> bytes:
         """生成SSE事件
 
         Args:
             agent_thought: 智能体思考记录对象，包含事件类型、思考内容、观察结果等信息
             event_id: 事件的唯一标识符
-            conversation: 会话对象，用于获取会话ID
-            message: 消息对象，用于获取消息ID
+            conversation_id: 字符串形式的会话ID
+            message_id: 字符串形式的消息ID
 
         Returns:
-            tuple[str, str]: 返回SSE格式的字符串，包含事件类型和数据
+            bytes: 返回SSE格式的字节串，包含事件类型和数据
 
         """
         # 构建事件数据字典，包含智能体思考记录的指定字段和额外信息
         data = {
-            # 从agent_thought中提取指定字段：
+            # 直接读取agent_thought的字段，避免每个token都走一遍model_dump的序列化流程：
             # 事件类型、思考内容、观察结果、工具信息、工具输入、答案和延迟
-            **agent_thought.model_dump(
-                include={
-                    "event",
-                    "thought",
-                    "observation",
-                    "tool",
-                    "tool_input",
-                    "answer",
-                    "latency",
-                },
-            ),
+            "event": agent_thought.event,
+            "thought": agent_thought.thought,
+            "observation": agent_thought.observation,
+            "tool": agent_thought.tool,
+            "tool_input": agent_thought.tool_input,
+            "answer": agent_thought.answer,
+            "latency": agent_thought.latency,
             # 添加事件唯一标识符
             "id": event_id,
-            # 添加会话ID（转换为字符串格式）
-            "conversation_id": str(conversation.id),
-            # 添加消息ID（转换为字符串格式）
-            "message_id": str(message.id),
-            # 添加任务ID（转换为字符串格式）
-            "task_id": str(agent_thought.task_id),
+            # 添加会话ID
+            "conversation_id": conversation_id,
+            # 添加消息ID
+            "message_id": message_id,
+            # 添加任务ID（orjson会将UUID序列化为字符串）
+            "task_id": agent_thought.task_id,
         }
 
-        # 返回SSE格式的事件字符串，格式为：event: 事件类型\ndata: JSON数据\n\n
+        # 返回SSE格式的事件字节串，格式为：event: 事件类型\ndata: JSON数据\n\n
+        # 该方法在每个token上都会被调用，使用orjson序列化并拼接预先生成的事件前缀
         return (
-            f"event: {agent_thought.event.value}\n"
-            f"data:{json.dumps(data, ensure_ascii=False)}\n\n"
+            _SSE_EVENT_PREFIXES[agent_thought.event]
+            + orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+            + b"\n\n"
         )
 
     def _save_agent_thoughts_async(
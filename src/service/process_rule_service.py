@@ -1,12 +1,61 @@
 import re
 from collections.abc import Callable
 from dataclasses import dataclass
+from functools import cache
 
 from injector import inject
 from langchain_text_splitters import RecursiveCharacterTextSplitter, TextSplitter
 
 from src.model.dataset import ProcessRule
 
+# 预编译文本清理使用的正则表达式，避免每次清理时重复查找或编译
+# 3个或以上的连续换行符（分组1），或多个连续的空白字符（包括制表符、空格等，分组2），
+# 两类字符互不重叠，合并为一次替换只需遍历一遍文本
+_RE_EXTRA_SPACE = re.compile(
+    r"(\n{3,})|([\t\f\r\x20\u00a0\u1680\u180e\u2000-\u200a\u202f\u205f\u3000]{2,})",
+)
+# 邮箱地址，只从连续字符段的开头（或紧跟在上一个邮箱之后的"_"、"+"处）开始尝试匹配，
+# 避免在不含"@"的长字符段中逐个位置重复扫描导致的平方级回溯，匹配结果与不加限制时一致
+_RE_EMAIL = re.compile(
+    r"(?:(?<![a-zA-Z0-9_.+-])|(?<=[a-zA-Z0-9.-])(?=[_+]))"
+    r"[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+",
+)
+# http/https开头的URL，需在移除邮箱之后再匹配，合并为一个正则会改变清理结果
+_RE_URL = re.compile(r"https?://\S+")
+
+
+def _replace_extra_space(match: re.Match) -> str:
+    """将连续换行符替换为2个换行符，将连续空白字符替换为单个空格"""
+    return "\n\n" if match.lastindex == 1 else " "
+
+
+def _remove_extra_space(text: str) -> str:
+    """移除多余的空格和换行符"""
+    return _RE_EXTRA_SPACE.sub(_replace_extra_space, text)
+
+
+def _remove_url_and_email(text: str) -> str:
+    """移除URL和邮箱地址"""
+    text = _RE_EMAIL.sub("", text)
+    return _RE_URL.sub("", text)
+
+
+# 预处理规则id与对应清理函数的映射
+_PRE_PROCESS_RULE_FUNCS: dict[str, Callable[[str], str]] = {
+    "remove_extra_space": _remove_extra_space,
+    "remove_url_and_email": _remove_url_and_email,
+}
+
+
+@cache
+def _build_pipeline(rule_ids: tuple[str, ...]) -> tuple[Callable[[str], str], ...]:
+    """根据按顺序启用的预处理规则id构建并缓存清理函数序列"""
+    return tuple(
+        _PRE_PROCESS_RULE_FUNCS[rule_id]
+        for rule_id in rule_ids
+        if rule_id in _PRE_PROCESS_RULE_FUNCS
+    )
+
 
 @inject
 @dataclass
@@ -80,32 +129,15 @@ class ProcessRuleService:
                - 移除http/https开头的URL
 
         """
-        # 遍历所有预处理规则
-        for pre_process_rule in process_rule.rule["pre_process_rules"]:
-            # 处理移除多余空格的规则
-            if (
-                pre_process_rule["id"] == "remove_extra_space"
-                and pre_process_rule["enabled"] is True
-            ):
-                # 将3个或以上的连续换行符替换为2个换行符
-                pattern = r"\n{3,}"
-                text = re.sub(pattern, "\n\n", text)
-                # 将多个连续的空白字符（包括制表符、空格等）替换为单个空格
-                pattern = (
-                    r"[\t\f\r\x20\u00a0\u1680\u180e\u2000-\u200a\u202f\u205f\u3000]{2,}"
-                )
-                text = re.sub(pattern, " ", text)
-
-            # 处理移除URL和邮箱的规则
-            if (
-                pre_process_rule["id"] == "remove_url_and_email"
-                and pre_process_rule["enabled"] is True
-            ):
-                # 移除邮箱地址
-                pattern = r"([a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+)"
-                text = re.sub(pattern, "", text)
-                # 移除http/https开头的URL
-                pattern = r"https?://[^\s]+"
-                text = re.sub(pattern, "", text)
+        # 按规则顺序获取已启用的预处理规则，同一组规则只解析一次
+        pipeline = _build_pipeline(
+            tuple(
+                pre_process_rule["id"]
+                for pre_process_rule in process_rule.rule["pre_process_rules"]
+                if pre_process_rule["enabled"] is True
+            ),
+        )
+        for step in pipeline:
+            text = step(text)
 
         return text
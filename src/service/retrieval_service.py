@@ -1,16 +1,28 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import cache
 from uuid import UUID
 
-from flask import Flask
+from flask import Flask, current_app
 from injector import inject
 from langchain.tools import BaseTool, tool
 from langchain_classic.retrievers import EnsembleRetriever
 from langchain_core.documents import Document as LCDocument
+from langchain_core.retrievers import BaseRetriever
 from pydantic import BaseModel, Field
-from sqlalchemy import update
+from redis import Redis, RedisError
+from sqlalchemy import Integer, Uuid, cast, column, func, insert, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
 
 from pkg.sqlalchemy.sqlalchemy import SQLAlchemy
 from src.core.agent.entities.agent_entity import DATASET_RETRIEVAL_TOOL_NAME
+from src.core.retrievers import FullTextRetriever, SemanticRetriever
+from src.entity.cache_entity import RETRIEVAL_CACHE_GENERATION
 from src.entity.dataset_entity import RetrievalSource, RetrievalStrategy
 from src.exception.exception import NotFoundException
 from src.lib.helper import combine_documents
@@ -19,6 +31,97 @@ from src.service.base_service import BaseService
 from src.service.jieba_service import JiebaService
 from src.service.vector_database_service import VectorDatabaseService
 
+logger = logging.getLogger(__name__)
+
+# 进程内检索结果缓存的最大条目数与有效期(秒)
+QUERY_CACHE_MAX_SIZE = 2000
+QUERY_CACHE_TTL = 300
+
+
+class QueryCache:
+    """线程安全的LRU+TTL检索结果缓存，超过容量时淘汰最久未使用的条目"""
+
+    def __init__(self, max_size: int, ttl_seconds: float) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.RLock()
+        self._data: OrderedDict[bytes, tuple[list[LCDocument], float]] = OrderedDict()
+
+    def get(self, key: bytes) -> list[LCDocument] | None:
+        """获取未过期的缓存结果，不存在或已过期时返回None"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return list(value)
+
+    def set(self, key: bytes, value: list[LCDocument]) -> None:
+        """写入缓存结果，并淘汰超出容量的最久未使用条目"""
+        with self._lock:
+            self._data[key] = (list(value), time.monotonic() + self.ttl_seconds)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+
+_query_cache = QueryCache(QUERY_CACHE_MAX_SIZE, QUERY_CACHE_TTL)
+
+# 进程内缓存的全文检索器最大数量，全文检索器按(知识库ID, k)复用，
+# 语义检索器持有随应用上下文关闭的向量数据库客户端，不做缓存
+RETRIEVER_CACHE_MAX_SIZE = 128
+_retriever_cache: OrderedDict[tuple, FullTextRetriever] = OrderedDict()
+_retriever_cache_lock = threading.Lock()
+
+
+@cache
+def _get_batch_search_executor(max_workers: int) -> ThreadPoolExecutor:
+    """懒加载批量检索时并发执行各条查询的线程池，整个进程内只创建一次
+
+    Args:
+        max_workers (int): 线程池的最大线程数，由RETRIEVAL_BATCH_SEARCH_WORKERS配置
+
+    Returns:
+        ThreadPoolExecutor: 批量检索线程池
+
+    """
+    return ThreadPoolExecutor(
+        max_workers=max_workers,
+        thread_name_prefix="retrieval-batch",
+    )
+
+
+@cache
+def _get_hybrid_search_executor(max_workers: int) -> ThreadPoolExecutor:
+    """懒加载混合检索时与全文检索并发执行语义检索的线程池，整个进程内只创建一次
+
+    与批量检索线程池分开，以免批量检索的线程等待混合检索任务时互相占满
+
+    Args:
+        max_workers (int): 线程池的最大线程数，由RETRIEVAL_HYBRID_SEARCH_WORKERS配置
+
+    Returns:
+        ThreadPoolExecutor: 混合检索线程池
+
+    """
+    return ThreadPoolExecutor(
+        max_workers=max_workers,
+        thread_name_prefix="retrieval-hybrid",
+    )
+
+
+def invalidate_retrieval_cache(redis_client: Redis) -> None:
+    """知识库内容发生变化后调用，递增缓存代数使所有进程中的检索结果缓存失效"""
+    try:
+        redis_client.incr(RETRIEVAL_CACHE_GENERATION)
+    except RedisError:
+        error_msg = "递增知识库检索缓存代数失败，检索结果缓存将在过期后刷新"
+        logger.exception(error_msg)
+
 
 @dataclass
 class RetrievalConfig:
@@ -31,10 +134,21 @@ class RetrievalConfig:
     retrieval_source: str = RetrievalSource.HIT_TESTING
 
 
+@dataclass(frozen=True)
+class SearchParams:
+    """单条查询之外的检索参数，与缓存代数、查询语句一同组成检索结果缓存键"""
+
+    dataset_ids: list[UUID]
+    retrieval_strategy: str
+    k: int
+    score: float
+
+
 @inject
 @dataclass
 class RetrievalService(BaseService):
     db: SQLAlchemy
+    redis_client: Redis
     jieba_service: JiebaService
     vector_database_service: VectorDatabaseService
 
@@ -72,31 +186,290 @@ class RetrievalService(BaseService):
         Note:
             该方法会自动记录查询历史并更新文档段的命中次数。
             混合检索时，语义检索和全文检索的权重各占50%。
+            相同条件的检索结果会在进程内缓存QUERY_CACHE_TTL秒，
+            知识库内容变化时通过invalidate_retrieval_cache使缓存失效。
+
+        """
+        k = kwargs.get("k", 4)  # 获取返回结果数量，默认为4
+        score = kwargs.get("score", 0)  # 获取相似度阈值，默认为0
+        # 校验知识库归属并提取有效的知识库ID列表
+        dataset_ids = self._get_valid_dataset_ids(dataset_ids, account_id)
+
+        # 优先从检索结果缓存中获取，命中时跳过向量检索与全文检索
+        lc_documents = self._search_with_cache(
+            self._get_cache_generation(),
+            query,
+            SearchParams(dataset_ids, retrieval_strategy, k, score),
+        )
+
+        # 记录查询历史并更新检索到的文档段的命中次数
+        self._record_queries([(query, lc_documents)], account_id, retrieval_source)
+
+        return lc_documents  # 返回检索结果
+
+    def batch_search_in_datasets(
+        self,
+        dataset_ids: list[UUID],
+        account_id: UUID,
+        queries: list[str],
+        retrieval_strategy: str = RetrievalStrategy.SEMANTIC,
+        retrieval_source: str = RetrievalSource.HIT_TESTING,
+        **kwargs: dict,
+    ) -> list[list[LCDocument]]:
+        """在指定的知识库中批量执行多条搜索查询，适用于查询扩展等多子查询场景。
+
+        Args:
+            dataset_ids (list[UUID]): 要搜索的知识库ID列表
+            account_id: 当前用户账户ID
+            queries (list[str]): 搜索查询字符串列表
+            retrieval_strategy (str, optional): 检索策略，默认为语义检索(SEMANTIC)
+            retrieval_source (str, optional): 检索来源标识，默认为HIT_TESTING
+            **kwargs: 额外的检索参数，包括：
+                - k (int): 每条查询返回结果数量，默认为4
+                - score (float): 相似度阈值，默认为0
+
+        Returns:
+            list[list[LCDocument]]: 与queries顺序一一对应的检索结果列表
+
+        Raises:
+            NotFoundException: 当指定的知识库ID不存在时抛出
+
+        Note:
+            知识库归属只校验一次，各条查询在线程池中并发检索，
+            查询历史与命中次数在同一事务中分别使用一条SQL语句批量写入。
 
         """
         k = kwargs.get("k", 4)  # 获取返回结果数量，默认为4
         score = kwargs.get("score", 0)  # 获取相似度阈值，默认为0
-        # 查询指定ID且属于当前账户的知识库
-        datasets = (
-            self.db.session.query(Dataset)
-            .filter(
+        if not queries:
+            return []
+
+        # 1.校验知识库归属并提取有效的知识库ID列表
+        dataset_ids = self._get_valid_dataset_ids(dataset_ids, account_id)
+
+        # 2.在线程池中并发检索，每个线程推送独立的应用上下文以使用各自的数据库会话
+        flask_app = current_app._get_current_object()  # noqa: SLF001
+        generation = self._get_cache_generation()
+        params = SearchParams(dataset_ids, retrieval_strategy, k, score)
+
+        def search(query: str) -> list[LCDocument]:
+            with flask_app.app_context():
+                return self._search_with_cache(generation, query, params)
+
+        executor = _get_batch_search_executor(
+            flask_app.config["RETRIEVAL_BATCH_SEARCH_WORKERS"],
+        )
+        documents_list = list(executor.map(search, queries))
+
+        # 3.记录所有查询的历史并更新命中次数
+        self._record_queries(
+            list(zip(queries, documents_list, strict=True)),
+            account_id,
+            retrieval_source,
+        )
+
+        return documents_list
+
+    def _get_valid_dataset_ids(
+        self,
+        dataset_ids: list[UUID],
+        account_id: UUID,
+    ) -> list[UUID]:
+        """查询指定ID且属于当前账户的知识库，返回有效的知识库ID列表"""
+        # 只查询ID列，避免加载完整的知识库模型
+        valid_dataset_ids = self.db.session.scalars(
+            select(Dataset.id).where(
                 Dataset.id.in_(dataset_ids),
                 Dataset.account_id == account_id,
-            )
-            .all()
-        )
+            ),
+        ).all()
         # 检查是否找到知识库
-        if datasets is None or len(datasets) == 0:
+        if not valid_dataset_ids:
             error_msg = f"没有找到ID为{dataset_ids}的知识库"
             raise NotFoundException(error_msg)
 
-        # 提取有效的知识库ID列表
-        dataset_ids = [dataset.id for dataset in datasets]
+        return list(valid_dataset_ids)
+
+    def _get_cache_generation(self) -> bytes | None:
+        """读取检索结果缓存代数，读取失败时返回None表示不使用缓存"""
+        try:
+            return self.redis_client.get(RETRIEVAL_CACHE_GENERATION) or b"0"
+        except RedisError:
+            return None
 
-        from src.core.retrievers.full_text_retriever import FullTextRetriever
-        from src.core.retrievers.semantic_retriever import SemanticRetriever
+    def _search_with_cache(
+        self,
+        generation: bytes | None,
+        query: str,
+        params: SearchParams,
+    ) -> list[LCDocument]:
+        """优先从检索结果缓存中获取，未命中时执行检索并写入缓存"""
+        if generation is None:
+            return self._retrieve(
+                params.dataset_ids,
+                query,
+                params.retrieval_strategy,
+                params.k,
+                params.score,
+            )
+
+        cache_key = hashlib.blake2b(
+            repr(
+                (
+                    sorted(str(dataset_id) for dataset_id in params.dataset_ids),
+                    query,
+                    str(params.retrieval_strategy),
+                    params.k,
+                    params.score,
+                    generation,
+                ),
+            ).encode(),
+        ).digest()
+        lc_documents = _query_cache.get(cache_key)
+        if lc_documents is None:
+            lc_documents = self._retrieve(
+                params.dataset_ids,
+                query,
+                params.retrieval_strategy,
+                params.k,
+                params.score,
+            )
+            _query_cache.set(cache_key, lc_documents)
+
+        return lc_documents
+
+    def _record_queries(
+        self,
+        query_documents: list[tuple[str, list[LCDocument]]],
+        account_id: UUID,
+        retrieval_source: str,
+    ) -> None:
+        """在同一个事务中记录查询历史并更新检索到的文档段的命中次数
+
+        Args:
+            query_documents: (查询语句, 检索结果)列表
+            account_id: 当前用户账户ID
+            retrieval_source: 检索来源标识
+
+        """
+        # 单次遍历检索结果，同时收集每条查询命中的知识库与各文档段的命中次数
+        rows = []
+        hit_counts = Counter()
+        for query, lc_documents in query_documents:
+            dataset_ids = set()
+            for lc_document in lc_documents:
+                metadata = lc_document.metadata
+                dataset_ids.add(str(metadata["dataset_id"]))
+                hit_counts[str(metadata["segment_id"])] += 1
+
+            # 每条查询命中的每个知识库各记录一条查询历史
+            rows.extend(
+                {
+                    "dataset_id": dataset_id,
+                    "query": query,
+                    "source": retrieval_source,
+                    "source_app_id": None,
+                    "created_by": account_id,
+                }
+                for dataset_id in dataset_ids
+            )
+
+        # 没有任何检索结果时无需记录，直接返回以省去一次事务
+        if not hit_counts:
+            return
+
+        with self.db.auto_commit():
+            # 使用一条批量INSERT语句写入查询历史
+            self.db.session.execute(insert(DatasetQuery), rows)
+
+            # 将文档段ID与命中次数以数组传入并展开为临时表，按主键关联后累加命中次数，
+            # 无论命中多少文档段都能稳定走主键索引的嵌套循环连接
+            hits = (
+                func.unnest(
+                    cast([UUID(segment_id) for segment_id in hit_counts], ARRAY(Uuid)),
+                    cast(list(hit_counts.values()), ARRAY(Integer)),
+                )
+                .table_valued(
+                    column("segment_id", Uuid),
+                    column("hit_count", Integer),
+                )
+                .render_derived()
+            )
+            # 之后不会再使用会话中的文档段对象，因此跳过会话同步
+            stmt = (
+                update(Segment)
+                .where(Segment.id == hits.c.segment_id)
+                .values(hit_count=Segment.hit_count + hits.c.hit_count)
+                .execution_options(synchronize_session=False)
+            )
+            self.db.session.execute(stmt)
+
+    def _retrieve(
+        self,
+        dataset_ids: list[UUID],
+        query: str,
+        retrieval_strategy: str,
+        k: int,
+        score: float,
+    ) -> list[LCDocument]:
+        """根据检索策略在指定知识库中执行检索并返回前k条结果"""
+        # 只获取所选检索策略对应的检索器，未知的检索策略按混合检索处理
+        if retrieval_strategy not in (
+            RetrievalStrategy.SEMANTIC,
+            RetrievalStrategy.FULL_TEXT,
+        ):
+            retrieval_strategy = RetrievalStrategy.HYBRID
+        retriever = self._get_retriever(dataset_ids, retrieval_strategy, k, score)
+        if retrieval_strategy == RetrievalStrategy.HYBRID:
+            return self._hybrid_retrieve(retriever, query)[:k]
+        return retriever.invoke(query)[:k]
+
+    @classmethod
+    def _hybrid_retrieve(
+        cls,
+        retriever: EnsembleRetriever,
+        query: str,
+    ) -> list[LCDocument]:
+        """并发执行混合检索器中的语义检索与全文检索，并按加权RRF合并结果
 
-        # 创建语义检索器，用于基于向量相似度的检索
+        Note:
+            EnsembleRetriever 会依次调用各子检索器，这里让两次I/O重叠执行。
+            语义检索只访问向量数据库，提交到线程池执行；全文检索依赖当前线程的数据库会话，
+            因此留在当前线程执行
+
+        """
+        semantic_retriever, full_text_retriever = retriever.retrievers
+        executor = _get_hybrid_search_executor(
+            current_app.config["RETRIEVAL_HYBRID_SEARCH_WORKERS"],
+        )
+        semantic_future = executor.submit(
+            semantic_retriever.invoke,
+            query,
+        )
+        full_text_documents = full_text_retriever.invoke(query)
+        return retriever.weighted_reciprocal_rank(
+            [semantic_future.result(), full_text_documents],
+        )
+
+    def _get_retriever(
+        self,
+        dataset_ids: list[UUID],
+        retrieval_strategy: RetrievalStrategy,
+        k: int,
+        score: float,
+    ) -> BaseRetriever:
+        """获取检索策略对应的检索器
+
+        Note:
+            语义检索器持有 flask_weaviate 的客户端，该客户端在应用上下文销毁时关闭，
+            因此每次调用重新构建；
+            只有不持有客户端的全文检索器按(知识库ID, k)在进程内复用
+
+        """
+        if retrieval_strategy == RetrievalStrategy.FULL_TEXT:
+            return self._get_full_text_retriever(dataset_ids, k)
+
+        # 语义检索器，基于向量相似度检索
         semantic_retriever = SemanticRetriever(
             dataset_ids=dataset_ids,
             vector_store=self.vector_database_service.vector_store,
@@ -105,8 +478,33 @@ class RetrievalService(BaseService):
                 "score_threshold": score,
             },
         )
-        # 创建全文检索器，用于基于关键词匹配的检索
-        full_text_retriever = FullTextRetriever(
+        if retrieval_strategy == RetrievalStrategy.SEMANTIC:
+            return semantic_retriever
+
+        # 混合检索器，结合语义和全文检索器的结果
+        return EnsembleRetriever(
+            retrievers=[
+                semantic_retriever,
+                self._get_full_text_retriever(dataset_ids, k),
+            ],
+            weights=[0.5, 0.5],  # 语义和全文检索的权重各占50%
+        )
+
+    def _get_full_text_retriever(
+        self,
+        dataset_ids: list[UUID],
+        k: int,
+    ) -> FullTextRetriever:
+        """获取全文检索器，相同(知识库ID, k)的全文检索器在进程内复用"""
+        cache_key = (tuple(sorted(str(dataset_id) for dataset_id in dataset_ids)), k)
+        with _retriever_cache_lock:
+            retriever = _retriever_cache.get(cache_key)
+            if retriever is not None:
+                _retriever_cache.move_to_end(cache_key)
+                return retriever
+
+        # 全文检索器，基于关键词匹配检索
+        retriever = FullTextRetriever(
             db=self.db,
             dataset_ids=dataset_ids,
             jieba_service=self.jieba_service,
@@ -114,53 +512,13 @@ class RetrievalService(BaseService):
                 "k": k,
             },
         )
-        # 创建混合检索器，结合语义和全文检索的结果
-        hybrid_retriever = EnsembleRetriever(
-            retrievers=[semantic_retriever, full_text_retriever],
-            weights=[0.5, 0.5],  # 语义和全文检索的权重各占50%
-        )
-
-        # 根据检索策略选择合适的检索器执行查询
-        if retrieval_strategy == RetrievalStrategy.SEMANTIC:
-            lc_documents = semantic_retriever.invoke(query)[:k]  # 语义检索
-        elif retrieval_strategy == RetrievalStrategy.FULL_TEXT:
-            lc_documents = full_text_retriever.invoke(query)[:k]  # 全文检索
-        else:
-            lc_documents = hybrid_retriever.invoke(query)[:k]  # 混合检索
-
-        # 记录每次查询的历史信息
-        unique_dataset_ids = list(
-            {str(lc_document.metadata["dataset_id"]) for lc_document in lc_documents},
-        )
-        for dataset_id in unique_dataset_ids:
-            self.create(
-                DatasetQuery,
-                dataset_id=dataset_id,
-                query=query,
-                source=retrieval_source,
-                source_app_id=None,
-                created_by=account_id,
-            )
 
-        # 更新检索到的文档段的命中次数
-        with self.db.auto_commit():
-            stmt = (
-                update(Segment)
-                .where(
-                    Segment.id.in_(
-                        [
-                            lc_document.metadata["segment_id"]
-                            for lc_document in lc_documents
-                        ],
-                    ),
-                )
-                .values(
-                    hit_count=Segment.hit_count + 1,  # 命中次数加1
-                )
-            )
-            self.db.session.execute(stmt)
+        with _retriever_cache_lock:
+            _retriever_cache[cache_key] = retriever
+            while len(_retriever_cache) > RETRIEVER_CACHE_MAX_SIZE:
+                _retriever_cache.popitem(last=False)
 
-        return lc_documents  # 返回检索结果
+        return retriever
 
     def create_langchain_tool_from_search(self, config: RetrievalConfig) -> BaseTool:
         """创建一个用于知识库搜索的LangChain工具。
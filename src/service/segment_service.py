@@ -1,17 +1,27 @@
 import logging
 import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 from datetime import UTC, datetime
+from functools import cache
 from uuid import UUID
 
+from flask import current_app
 from injector import inject
 from langchain_core.documents import Document as LCDocument
+from langchain_core.embeddings import Embeddings
 from redis import Redis
-from sqlalchemy import asc, func
+from sqlalchemy import asc, func, select
+from weaviate.collections import Collection
 
 from pkg.paginator.paginator import Paginator
 from pkg.sqlalchemy.sqlalchemy import SQLAlchemy
-from src.entity.cache_entity import LOCK_EXPIRE_TIME, LOCK_SEGMENT_UPDATE_ENABLED
+from src.entity.cache_entity import (
+    LOCK_EXPIRE_TIME,
+    LOCK_SEGMENT_UPDATE_ENABLED,
+    SEGMENT_ENABLED_VERSION,
+    SEGMENT_ENABLED_VERSION_EXPIRE_TIME,
+)
 from src.entity.dataset_entity import MAX_CREATE_TOKEN, DocumentStatus, SegmentStatus
 from src.exception.exception import (
     FailException,
@@ -31,11 +41,30 @@ from src.service.base_service import BaseService
 from src.service.embeddings_service import EmbeddingsService
 from src.service.jieba_service import JiebaService
 from src.service.keyword_table_service import KeywordTableService
+from src.service.retrieval_service import invalidate_retrieval_cache
 from src.service.vector_database_service import VectorDatabaseService
+from src.task.segment_task import update_segment_vector_enabled
 
 logger = logging.getLogger(__name__)
 
 
+@cache
+def _get_vector_update_executor(max_workers: int) -> ThreadPoolExecutor:
+    """懒加载更新文档片段时并发执行向量化及向量数据库写入的线程池，整个进程内只创建一次
+
+    Args:
+        max_workers (int): 线程池的最大线程数，由SEGMENT_VECTOR_UPDATE_WORKERS配置
+
+    Returns:
+        ThreadPoolExecutor: 向量更新线程池
+
+    """
+    return ThreadPoolExecutor(
+        max_workers=max_workers,
+        thread_name_prefix="segment-vector",
+    )
+
+
 @inject
 @dataclass
 class SegmentService(BaseService):
@@ -98,9 +127,7 @@ class SegmentService(BaseService):
 
         # 从向量数据库中删除对应的向量数据
         try:
-            self.vector_database_service.collection.data.delete_by_id(
-                str(segment.node_id),
-            )
+            self.vector_database_service.delete_by_node_ids([segment.node_id])
         except Exception as e:
             error_msg = f"删除文档片段失败，文档片段 {segment_id}, 错误信息： {e!s}"
             logger.exception(error_msg)
@@ -128,6 +155,9 @@ class SegmentService(BaseService):
             token_count=document_token_count,
         )
 
+        # 知识库内容已变化，使检索结果缓存失效
+        invalidate_retrieval_cache(self.redis_client)
+
         return segment
 
     def create_segment(
@@ -159,7 +189,7 @@ class SegmentService(BaseService):
             Segment: 创建成功的文档片段对象
 
         Raises:
-            ValidateErrorException: 当输入内容超过token限制时
+            ValidateErrorException: 当输入内容超过token限制或文档中已存在相同内容时
             NotFoundException: 当文档不存在或无权限时
             FailException: 当文档状态不正确或创建失败时
 
@@ -201,6 +231,18 @@ class SegmentService(BaseService):
             # 抛出操作失败异常
             raise FailException(error_msg)
 
+        # 同一文档内片段哈希值具有唯一约束，文档中已有相同内容时提前返回错误，
+        # 避免提取关键词、写入数据库和上传向量后才因唯一约束失败；
+        # 只在当前账户已通过权限校验的文档内查找，不会暴露其他文档的内容
+        segment_hash = generate_text_hash(req.content.data)
+        if self.db.session.scalar(
+            select(Segment.id)
+            .where(Segment.document_id == document_id, Segment.hash == segment_hash)
+            .limit(1),
+        ):
+            error_msg = f"该文档中已存在相同内容的片段，文档ID为{document_id}"
+            raise ValidateErrorException(error_msg)
+
         # 查询指定文档中最大的段落位置，如果不存在则默认为0
         position = (
             self.db.session.query(
@@ -228,6 +270,8 @@ class SegmentService(BaseService):
         try:
             # 位置计数器加1
             position += 1
+            # 片段同步完成处理，各处理时间戳共用同一时间
+            now = datetime.now(UTC)
             # 创建新的文档片段
             segment = self.create(
                 Segment,  # 创建Segment对象
@@ -240,16 +284,16 @@ class SegmentService(BaseService):
                 character_count=len(req.content.data),  # 字符计数
                 token_count=token_count,  # token计数
                 keywords=req.keywords.data,  # 关键词
-                hash=generate_text_hash(req.content.data),  # 内容哈希值
+                hash=segment_hash,  # 内容哈希值
                 enabled=True,  # 启用状态
-                processing_started_at=datetime.now(UTC),  # 处理开始时间
-                indexing_completed_at=datetime.now(UTC),  # 索引完成时间
-                completed_at=datetime.now(UTC),  # 完成时间
+                processing_started_at=now,  # 处理开始时间
+                indexing_completed_at=now,  # 索引完成时间
+                completed_at=now,  # 完成时间
                 status=SegmentStatus.COMPLETED,  # 状态为已完成
             )
 
-            # 将文档片段添加到向量数据库
-            self.vector_database_service.vector_store.aadd_documents(
+            # 将文档片段同步添加到向量数据库，失败时由下方异常处理将片段标记为错误
+            self.vector_database_service.vector_store.add_documents(
                 [
                     LCDocument(  # 创建文档对象
                         page_content=req.content.data,  # 页面内容
@@ -267,27 +311,12 @@ class SegmentService(BaseService):
                 ids=[str(segment.node_id)],  # 使用节点ID作为文档ID
             )
 
-            # 查询文档的总字符数和token数
-            document_character_count, document_token_count = (
-                self.db.session.query(
-                    func.coalesce(
-                        func.sum(Segment.character_count),
-                        0,
-                    ),  # 计算字符总数，如果没有则为0
-                    func.coalesce(
-                        func.sum(Segment.token_count),
-                        0,
-                    ),  # 计算token总数，如果没有则为0
-                )
-                .filter(Segment.document_id == document.id)
-                .first()
-            )
-
-            # 更新文档的字符数和token数
+            # 在数据库中直接累加文档的字符数和token数，无需重新汇总全部片段，
+            # 并发新增片段时也不会相互覆盖
             self.update(
                 document,
-                character_count=document_character_count,
-                token_count=document_token_count,
+                character_count=Document.character_count + len(req.content.data),
+                token_count=Document.token_count + token_count,
             )
 
             # 如果文档启用，则添加关键词表
@@ -303,18 +332,14 @@ class SegmentService(BaseService):
             logger.exception(exception_msg)
             # 如果segment已创建，则更新其状态为错误
             if segment:
-                self.update(
-                    segment,
-                    error=str(e),
-                    status=SegmentStatus.ERROR,
-                    enabled=False,
-                    disabled_at=datetime.now(UTC),
-                    stopped_at=datetime.now(UTC),
-                )
+                self._mark_segment_error(segment, e)
             # 抛出异常
             error_msg = f"新增文档片段失败，文档ID为{document_id}"
             raise FailException(error_msg) from e
 
+        # 知识库内容已变化，使检索结果缓存失效
+        invalidate_retrieval_cache(self.redis_client)
+
         # 返回创建的文档片段
         return segment
 
@@ -351,23 +376,15 @@ class SegmentService(BaseService):
             当前account_id是硬编码的，实际应用中应从认证信息获取
 
         """
-        # 根据文档ID获取文档对象
-        document = self.get(Document, document_id)
-        # 检查文档是否存在
-        if document is None:
-            error_msg = f"文档不存在：{document_id}"
-            raise NotFoundException(error_msg)
-        # 验证文档所属知识库和账户权限
-        if document.dataset_id != dataset_id or document.account_id != account.id:
-            error_msg = f"无权限访问文档：{document_id}"
-            raise ForbiddenException(error_msg)
+        # 获取文档对象并校验访问权限
+        self._get_authorized_document(dataset_id, document_id, account)
 
         # 创建分页器对象，传入数据库连接和请求对象
         paginator = Paginator(db=self.db, req=req)
 
         # 初始化过滤条件列表，首先按文档ID进行过滤
         filters = [Segment.document_id == document_id]
-        # 如果请求中包含搜索关键词，则添加内容模糊匹配的过滤条件
+        # 如果请求中包含搜索关键词，则添加内容模糊匹配的过滤条件（由三元组索引加速）
         if req.search_word.data:
             filters.append(Segment.content.ilike(f"%{req.search_word.data}%"))
 
@@ -388,8 +405,8 @@ class SegmentService(BaseService):
         """获取单个文档片段信息。
 
         该方法用于获取指定文档片段的详细信息：
-        1. 验证文档存在性和访问权限
-        2. 验证片段存在性和访问权限
+        1. 验证片段存在性
+        2. 根据片段记录的知识库、文档和账户验证访问权限
         3. 返回片段详细信息
 
         Args:
@@ -402,31 +419,25 @@ class SegmentService(BaseService):
             Segment: 文档片段对象
 
         Raises:
-            NotFoundException: 当文档或片段不存在时
+            NotFoundException: 当片段不存在时
             ForbiddenException: 当无访问权限时
 
         Note:
             当前account_id是硬编码的，实际应用中应从认证信息获取
 
         """
-        # 根据文档ID获取文档对象
-        document = self.get(Document, document_id)
-        # 检查文档是否存在
-        if document is None:
-            error_msg = f"文档不存在：{document_id}"
-            raise NotFoundException(error_msg)
-        # 验证文档所属知识库和账户权限
-        if document.dataset_id != dataset_id or document.account_id != account.id:
-            error_msg = f"无权限访问文档：{document_id}"
-            raise ForbiddenException(error_msg)
-
+        # 片段自身记录了所属知识库、文档和账户，直接校验即可，无需再查询文档
         segment = self.get(Segment, segment_id)
         # 检查文档片段是否存在
         if segment is None:
             error_msg = f"文档片段不存在：{segment_id}"
             raise NotFoundException(error_msg)
-        # 验证段落所属文档和账户权限
-        if segment.document_id != document_id or segment.account_id != account.id:
+        # 验证段落所属知识库、文档和账户权限
+        if (
+            segment.dataset_id != dataset_id
+            or segment.document_id != document_id
+            or segment.account_id != account.id
+        ):
             error_msg = f"无权限访问文档片段：{segment_id}"
             raise ForbiddenException(error_msg)
 
@@ -447,8 +458,8 @@ class SegmentService(BaseService):
         1. 验证文档和片段的存在性及权限
         2. 验证片段状态是否为已完成
         3. 使用分布式锁防止并发更新
-        4. 更新向量数据库中的状态
-        5. 更新关键词表
+        4. 更新数据库与关键词表
+        5. 释放锁后异步更新向量数据库中的状态
         6. 处理异常和错误恢复
 
         Args:
@@ -471,18 +482,20 @@ class SegmentService(BaseService):
             使用Redis分布式锁确保并发安全性
 
         """
-        # 根据文档ID获取文档对象
-        document = self.get(Document, document_id)
-        # 检查文档是否存在
-        if document is None:
-            error_msg = f"文档不存在：{document_id}"
-            raise NotFoundException(error_msg)
-        # 验证文档所属知识库和账户权限
-        if document.dataset_id != dataset_id or document.account_id != account.id:
-            error_msg = f"无权限访问文档：{document_id}"
-            raise ForbiddenException(error_msg)
-        # 根据文档ID和段落ID获取段落对象
-        segment = self.get(Segment, segment_id)
+        # 使用一条查询同时获取文档对象和段落对象，段落不存在时为None
+        row = self.db.session.execute(
+            select(Document, Segment)
+            .outerjoin(Segment, Segment.id == segment_id)
+            .where(Document.id == document_id),
+        ).first()
+        document, segment = row if row is not None else (None, None)
+        # 校验文档是否存在以及访问权限
+        document = self._check_document_access(
+            document,
+            dataset_id,
+            document_id,
+            account,
+        )
         # 检查文档片段是否存在
         if segment is None:
             error_msg = f"文档片段不存在：{segment_id}"
@@ -502,15 +515,20 @@ class SegmentService(BaseService):
             error_msg = f"文档片段状态未改变：{segment_id}，状态：{segment.enabled}"
             raise FailException(error_msg)
 
-        # 生成缓存键，检查是否有其他进程正在更新文档片段状态
+        # 生成缓存键，以非阻塞方式原子地获取分布式锁（SET NX PX），
+        # 获取失败说明有其他进程正在更新文档片段状态
         cache_key = LOCK_SEGMENT_UPDATE_ENABLED.format(dataset_id=dataset_id)
-        cache_result = self.redis_client.get(cache_key)
-        if cache_result is not None:
+        lock = self.redis_client.lock(
+            cache_key,
+            timeout=LOCK_EXPIRE_TIME,
+            blocking=False,
+        )
+        if not lock.acquire():
             error_msg = f"文档片段状态更新中：{segment_id}，状态：{segment.status}"
             raise FailException(error_msg)
 
-        # 使用分布式锁确保更新的原子性
-        with self.redis_client.lock(cache_key, timeout=LOCK_EXPIRE_TIME):
+        # 锁内只处理数据库与关键词表
+        try:
             try:
                 # 更新文档片段的启用状态和相关时间戳
                 self.update(
@@ -520,7 +538,7 @@ class SegmentService(BaseService):
                 )
 
                 # 如果启用文档片段且文档本身也是启用的，则添加关键词表
-                if enabled is True and segment.document.enabled is True:
+                if enabled is True and document.enabled is True:
                     self.keyword_table_service.add_keyword_table_from_ids(
                         dataset_id,
                         [segment_id],
@@ -531,34 +549,157 @@ class SegmentService(BaseService):
                         dataset_id,
                         [segment_id],
                     )
-
-                # 更新向量数据库中的文档片段启用状态
-                self.vector_database_service.collection.data.update(
-                    uuid=segment.node_id,
-                    properties={"segment_enabled": enabled},
-                )
             except Exception as e:
                 # 异常处理：记录错误日志，更新文档片段状态为错误，并禁用文档片段
-                exception_msg = (
-                    f"文档片段状态更新失败：{segment_id}，",
-                    f"状态：{segment.status}, 错误：{e!s}",
-                )
-                logger.exception(exception_msg)
-                self.update(
-                    segment,
-                    error=str(e),
-                    status=SegmentStatus.ERROR,
-                    enabled=False,
-                    disabled_at=datetime.now(UTC),
-                    stopped_at=datetime.now(UTC),
+                logger.exception(
+                    "文档片段状态更新失败：%s，状态：%s",
+                    segment_id,
+                    segment.status,
                 )
+                self._mark_segment_error(segment, e)
                 error_msg = (
                     f"文档片段状态更新失败：{segment_id}，状态：{segment.status}"
                 )
                 raise FailException(error_msg) from e
 
+            # 在锁内递增启用状态的切换版本号，使版本号顺序与数据库中的切换顺序一致
+            version = self._bump_segment_enabled_version(segment_id)
+        finally:
+            lock.release()
+
+        # 向量数据库的更新耗时较长，释放锁后交由异步任务处理，
+        # 任务会以数据库中的最新状态为准，失败时由任务回滚文档片段状态
+        update_segment_vector_enabled.delay(segment.id, version)
+
+        # 文档片段启用状态已变化，使检索结果缓存失效
+        invalidate_retrieval_cache(self.redis_client)
+
         return segment
 
+    def update_segment_vector_enabled(self, segment_id: UUID, version: int) -> None:
+        """将数据库中文档片段的启用状态同步到向量数据库，失败时将文档片段标记为错误并禁用
+
+        Args:
+            segment_id (UUID): 文档片段ID
+            version (int): 投递任务时启用状态的切换版本号
+
+        Note:
+            多次切换产生的任务可能在不同工作进程中乱序执行，因此始终同步数据库中的最新状态，
+            而不是投递任务时的状态；同步失败时若状态已被再次切换，则交由最新的任务处理，
+            不再回滚文档片段
+
+        """
+        segment = self.get(Segment, segment_id)
+        if segment is None:
+            return
+
+        try:
+            # 更新向量数据库中的文档片段启用状态
+            self.vector_database_service.collection.data.update(
+                uuid=segment.node_id,
+                properties={"segment_enabled": segment.enabled},
+            )
+        except Exception as e:
+            exception_msg = f"向量数据库文档片段状态更新失败：{segment_id}，错误：{e!s}"
+            logger.exception(exception_msg)
+            if self._get_segment_enabled_version(segment_id) != version:
+                warning_msg = f"文档片段状态已再次切换，跳过回滚：{segment_id}"
+                logger.warning(warning_msg)
+                return
+            # 回滚：禁用文档片段并移除其关键词，使数据库与关键词表保持一致
+            self._mark_segment_error(segment, e)
+            self.keyword_table_service.delete_keyword_table_from_ids(
+                segment.dataset_id,
+                [segment_id],
+            )
+
+        # 向量数据库中的启用状态已变化，使检索结果缓存失效
+        invalidate_retrieval_cache(self.redis_client)
+
+    def _bump_segment_enabled_version(self, segment_id: UUID) -> int:
+        """递增文档片段启用状态的切换版本号并返回新的版本号"""
+        cache_key = SEGMENT_ENABLED_VERSION.format(segment_id=segment_id)
+        with self.redis_client.pipeline() as pipe:
+            pipe.incr(cache_key)
+            pipe.expire(cache_key, SEGMENT_ENABLED_VERSION_EXPIRE_TIME)
+            version, _ = pipe.execute()
+        return version
+
+    def _get_segment_enabled_version(self, segment_id: UUID) -> int:
+        """获取文档片段启用状态当前的切换版本号，不存在时返回0"""
+        version = self.redis_client.get(
+            SEGMENT_ENABLED_VERSION.format(segment_id=segment_id),
+        )
+        return int(version) if version is not None else 0
+
+    @classmethod
+    def _update_segment_vector(
+        cls,
+        collection: Collection,
+        embeddings: Embeddings,
+        node_id: UUID,
+        content: str,
+    ) -> None:
+        """重新向量化文档片段内容并更新向量数据库中对应的记录
+
+        Note:
+            该方法在线程池中执行，没有应用上下文，collection与embeddings
+            需由调用方在请求线程中获取后传入，线程内只发起网络请求
+
+        """
+        collection.data.update(
+            uuid=str(node_id),
+            properties={"text": content},
+            vector=embeddings.embed_query(content),
+        )
+
+    def _get_authorized_document(
+        self,
+        dataset_id: UUID,
+        document_id: UUID,
+        account: Account,
+    ) -> Document:
+        """获取文档并校验其所属知识库和账户权限
+
+        Note:
+            session.get 会优先命中会话的标识映射，
+            同一请求内重复获取同一文档不会再次查询数据库
+
+        """
+        document = self.get(Document, document_id)
+        return self._check_document_access(document, dataset_id, document_id, account)
+
+    @classmethod
+    def _check_document_access(
+        cls,
+        document: Document | None,
+        dataset_id: UUID,
+        document_id: UUID,
+        account: Account,
+    ) -> Document:
+        """校验文档是否存在且属于当前账户的指定知识库，校验通过后返回文档"""
+        # 检查文档是否存在
+        if document is None:
+            error_msg = f"文档不存在：{document_id}"
+            raise NotFoundException(error_msg)
+        # 验证文档所属知识库和账户权限
+        if document.dataset_id != dataset_id or document.account_id != account.id:
+            error_msg = f"无权限访问文档：{document_id}"
+            raise ForbiddenException(error_msg)
+        return document
+
+    def _mark_segment_error(self, segment: Segment, e: Exception) -> None:
+        """将文档片段标记为错误状态并禁用"""
+        now = datetime.now(UTC)
+        self.update(
+            segment,
+            error=str(e),
+            status=SegmentStatus.ERROR,
+            enabled=False,
+            disabled_at=now,
+            stopped_at=now,
+        )
+
     def update_segment(
         self,
         dataset_id: UUID,
@@ -625,19 +766,36 @@ class SegmentService(BaseService):
         new_hash = generate_text_hash(req.content.data)
         required_update = segment.hash != new_hash
 
+        vector_future: Future | None = None
         try:
-            # 5.更新segment表记录
+            # 5.更新segment表记录，内容未变化时沿用已有的token数，无需重新编码
             self.update(
                 segment,
                 keywords=req.keywords.data,
                 content=req.content.data,
                 hash=new_hash,
                 character_count=len(req.content.data),
-                token_count=self.embeddings_service.calculate_token_count(
-                    req.content.data,
+                token_count=(
+                    self.embeddings_service.calculate_token_count(req.content.data)
+                    if required_update
+                    else segment.token_count
                 ),
             )
 
+            # 6.内容变化时，向量化与向量数据库写入均为远程调用且不依赖数据库会话，
+            # 提交到线程池与后续关键词表、文档信息的更新并发执行
+            if required_update:
+                executor = _get_vector_update_executor(
+                    current_app.config["SEGMENT_VECTOR_UPDATE_WORKERS"],
+                )
+                vector_future = executor.submit(
+                    self._update_segment_vector,
+                    self.vector_database_service.collection,
+                    self.embeddings_service.embeddings,
+                    segment.node_id,
+                    req.content.data,
+                )
+
             # 7.更新片段归属关键词信息
             self.keyword_table_service.delete_keyword_table_from_ids(
                 dataset_id,
@@ -666,17 +824,14 @@ class SegmentService(BaseService):
                     token_count=document_token_count,
                 )
 
-                # 9.更新向量数据库对应记录
-                self.vector_database_service.collection.data.update(
-                    uuid=str(segment.node_id),
-                    properties={
-                        "text": req.content.data,
-                    },
-                    vector=self.embeddings_service.embeddings.embed_query(
-                        req.content.data,
-                    ),
-                )
+            # 9.等待向量数据库对应记录更新完成，并抛出其中的异常
+            if vector_future is not None:
+                vector_future.result()
         except Exception as e:
+            # 关键词表或文档信息更新失败时，取消尚未开始的向量更新，
+            # 已在执行的则等待其结束，避免请求返回后仍在后台写入向量数据库
+            if vector_future is not None and not vector_future.cancel():
+                wait([vector_future])
             error_exception = (
                 f"更新文档片段记录失败, segment_id: {segment_id}, 错误信息: {e!s}"
             )
@@ -684,4 +839,7 @@ class SegmentService(BaseService):
             error_msg = "更新文档片段记录失败，请稍后尝试"
             raise FailException(error_msg) from e
 
+        # 知识库内容已变化，使检索结果缓存失效
+        invalidate_retrieval_cache(self.redis_client)
+
         return segment
@@ -1,7 +1,6 @@
 import json
 import os
 import secrets
-import string
 from datetime import UTC, datetime, timedelta
 
 from alibabacloud_dypnsapi20170525 import models as dypnsapi_20170525_models
@@ -9,13 +8,26 @@ from alibabacloud_dypnsapi20170525.client import Client as Dypnsapi20170525Clien
 from alibabacloud_tea_openapi import models as open_api_models
 from injector import inject
 from redis import Redis
-from sqlalchemy import desc
+from sqlalchemy import bindparam, select
 
 from pkg.sqlalchemy.sqlalchemy import SQLAlchemy
 from src.exception.exception import FailException
 from src.model.account import VerificationCode
 from src.service.base_service import BaseService
 
+# 查询最新的未使用短信验证码的语句，在模块加载时构建一次，复用SQLAlchemy的编译缓存；
+# used条件需与部分索引的谓词保持一致，排序方向与索引中的created_at DESC相同
+_VERIFY_SMS_CODE_STMT = (
+    select(VerificationCode)
+    .where(
+        VerificationCode.account == bindparam("account"),
+        VerificationCode.code == bindparam("code"),
+        VerificationCode.used.is_(False),
+    )
+    .order_by(VerificationCode.created_at.desc())
+    .limit(1)
+)
+
 
 @inject
 class SmsService(BaseService):
@@ -34,7 +46,8 @@ class SmsService(BaseService):
 
     def generate_verification_code(self, length=6) -> str:
         """生成6位数字验证码"""
-        return "".join(secrets.choice(string.digits) for _ in range(length))
+        # 一次性均匀抽取0~10^length-1之间的随机数，并在左侧补零到指定长度
+        return f"{secrets.randbelow(10**length):0{length}d}"
 
     def send_sms_verify_code(self, phone_number) -> str:
         """发送短信验证码"""
@@ -76,15 +89,10 @@ class SmsService(BaseService):
 
     def verify_sms_code(self, phone_number, verify_code) -> bool:
         """验证短信验证码"""
-        code_record = (
-            self.db.session.query(VerificationCode)
-            .filter_by(
-                account=phone_number,
-                code=verify_code,
-                used=False,
-            )
-            .order_by(desc(VerificationCode.created_at))
-            .first()
+        # 查询最新的未使用的验证码记录
+        code_record = self.db.session.scalar(
+            _VERIFY_SMS_CODE_STMT,
+            {"account": phone_number, "code": verify_code},
         )
 
         if not code_record:
@@ -1,14 +1,19 @@
 from dataclasses import dataclass
+from uuid import UUID
 
+from flask import g
 from flask_weaviate import FlaskWeaviate
 from injector import inject
 from langchain_core.vectorstores import VectorStoreRetriever
 from langchain_weaviate import WeaviateVectorStore
+from weaviate.classes.query import Filter
 from weaviate.collections import Collection
 
 from src.service.embeddings_service import EmbeddingsService
 
 COLLECTION_NAME = "Dataset"
+# 单次批量删除请求中包含的最大向量数量
+DELETE_BATCH_SIZE = 1000
 
 
 @inject
@@ -41,12 +46,21 @@ class VectorDatabaseService:
 
     @property
     def vector_store(self) -> WeaviateVectorStore:
-        return WeaviateVectorStore(
-            client=self.weaviate.client,
-            index_name=COLLECTION_NAME,
-            text_key="text",
-            embedding=self.embeddings_service.cache_backed_embeddings,
-        )
+        """Weaviate向量存储实例
+
+        Note:
+            flask_weaviate 将客户端存放在 flask.g 中，并在应用上下文销毁时关闭，
+            因此向量存储同样缓存在 flask.g 中，同一应用上下文内只创建一次
+
+        """
+        if "weaviate_vector_store" not in g:
+            g.weaviate_vector_store = WeaviateVectorStore(
+                client=self.weaviate.client,
+                index_name=COLLECTION_NAME,
+                text_key="text",
+                embedding=self.embeddings_service.cache_backed_embeddings,
+            )
+        return g.weaviate_vector_store
 
     def get_retriever(self) -> VectorStoreRetriever:
         """获取向量存储的检索器实例
@@ -59,4 +73,26 @@ class VectorDatabaseService:
 
     @property
     def collection(self) -> Collection:
-        return self.weaviate.client.collections.get(COLLECTION_NAME)
+        """向量数据库集合实例，缓存在 flask.g 中，同一应用上下文内只获取一次"""
+        if "weaviate_collection" not in g:
+            g.weaviate_collection = self.weaviate.client.collections.get(
+                COLLECTION_NAME,
+            )
+        return g.weaviate_collection
+
+    def delete_by_node_ids(self, node_ids: list[UUID | str]) -> None:
+        """根据节点ID批量删除向量数据
+
+        每批最多删除DELETE_BATCH_SIZE条向量，每批只发起一次删除请求，
+        避免逐条调用delete_by_id造成的多次网络往返。
+
+        Args:
+            node_ids (list[UUID | str]): 需要删除的向量节点ID列表
+
+        """
+        for i in range(0, len(node_ids), DELETE_BATCH_SIZE):
+            self.collection.data.delete_many(
+                where=Filter.by_id().contains_any(
+                    [str(node_id) for node_id in node_ids[i : i + DELETE_BATCH_SIZE]],
+                ),
+            )
@@ -13,7 +13,6 @@ from src.core.agent.agents import AgentQueueManager, FunctionCallAgent
 from src.core.agent.agents.react_agent import ReACTAgent
 from src.core.agent.entities.agent_entity import AgentConfig
 from src.core.agent.entities.queue_entity import QueueEvent
-from src.core.llm_model.entities.model_entity import ModelFeature
 from src.core.memory import TokenBufferMemory
 from src.entity.app_entity import AppStatus
 from src.entity.conversation_entity import InvokeFrom, MessageStatus
@@ -181,9 +180,7 @@ class WebAppService(BaseService):
             tools.extend(workflow_tools)
 
         # 12.根据LLM是否支持tool_call决定使用不同的Agent
-        agent_class = (
-            FunctionCallAgent if ModelFeature.TOOL_CALL in llm.features else ReACTAgent
-        )
+        agent_class = FunctionCallAgent if llm.supports_tool_call else ReACTAgent
         agent = agent_class(
             name="web_app_agent",
             llm=llm,
@@ -0,0 +1,109 @@
+import logging
+from datetime import datetime
+
+from celery import Task, shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, max_retries=3)
+def create_verification_code(
+    self: Task,
+    email: str,
+    verify_code: str,
+    expires_at: datetime,
+) -> None:
+    """异步写入邮箱验证码记录任务
+
+    Args:
+        self (Task): 当前Celery任务实例，用于失败时重新投递任务
+        email (str): 验证码对应的邮箱地址
+        verify_code (str): 生成的验证码
+        expires_at (datetime): 验证码的过期时间
+
+    Returns:
+        None: 无返回值
+
+    Note:
+        记录可能晚于验证码通过Redis校验才写入，此时Redis中的已使用标记仍然有效
+        （标记在校验时写入，有效期不短于记录的剩余有效期），数据库回退校验会拒绝该验证码
+
+    """
+    from app.http.module import injector
+    from src.service.mail_service import MailService
+
+    mail_service: MailService = injector.get(MailService)
+    try:
+        mail_service.create_verification_code(email, verify_code, expires_at)
+    except Exception as e:
+        warning_msg = f"验证码记录写入失败: {e!s}"
+        logger.warning(warning_msg)
+        raise self.retry(exc=e, countdown=2**self.request.retries) from e
+
+
+@shared_task(bind=True, max_retries=3)
+def send_verify_code_mail(self: Task, email: str, verify_code: str) -> None:
+    """异步发送邮箱验证码邮件任务
+
+    Args:
+        self (Task): 当前Celery任务实例，用于发送失败时重新投递任务
+        email (str): 接收验证码的邮箱地址
+        verify_code (str): 需要发送的验证码
+
+    Returns:
+        None: 无返回值
+
+    Note:
+        发送失败时记录警告日志，并按指数退避重新投递任务，不会影响接口调用方
+
+    """
+    from app.http.module import injector
+    from src.service.mail_service import MailService
+
+    mail_service: MailService = injector.get(MailService)
+    try:
+        mail_service.send_verify_code_mail(email, verify_code)
+    except Exception as e:
+        warning_msg = f"验证码邮件发送失败: {e!s}"
+        logger.warning(warning_msg)
+        raise self.retry(exc=e, countdown=2**self.request.retries) from e
+
+
+@shared_task(bind=True, max_retries=3)
+def mark_mail_code_used(self: Task, email: str, verify_code: str) -> None:
+    """异步将通过缓存校验的邮箱验证码标记为已使用
+
+    Args:
+        self (Task): 当前Celery任务实例，用于记录尚未写入时重新投递任务
+        email (str): 验证码对应的邮箱地址
+        verify_code (str): 已通过校验的验证码
+
+    Returns:
+        None: 无返回值
+
+    Note:
+        验证码记录同样是异步写入的，尚未写入时稍后重试，避免记录写入后仍处于未使用状态。
+        重试耗尽时记录虽仍为未使用，但Redis中的已使用标记会阻止其通过数据库回退校验
+
+    """
+    from app.http.module import injector
+    from src.service.mail_service import MailService
+
+    mail_service: MailService = injector.get(MailService)
+    if not mail_service.mark_mail_code_used(email, verify_code):
+        raise self.retry(countdown=2**self.request.retries)
+
+
+@shared_task
+def purge_expired_verification_codes() -> None:
+    """定时清理过期验证码记录任务
+
+    Returns:
+        None: 无返回值
+
+    """
+    from app.http.module import injector
+    from src.service.mail_service import MailService
+
+    mail_service: MailService = injector.get(MailService)
+    mail_service.purge_expired_verification_codes()
@@ -0,0 +1,22 @@
+from uuid import UUID
+
+from celery import shared_task
+
+
+@shared_task
+def update_segment_vector_enabled(segment_id: UUID, version: int) -> None:
+    """异步将文档片段的启用状态同步到向量数据库任务
+
+    Args:
+        segment_id (UUID): 需要同步启用状态的文档片段ID
+        version (int): 投递任务时启用状态的切换版本号，用于判断状态是否已再次切换
+
+    Returns:
+        None: 无返回值
+
+    """
+    from app.http.module import injector
+    from src.service.segment_service import SegmentService
+
+    segment_service: SegmentService = injector.get(SegmentService)
+    segment_service.update_segment_vector_enabled(segment_id, version)
@@ -0,0 +1,37 @@
+from datetime import UTC, datetime, timedelta
+from unittest.mock import Mock
+
+import pytest
+
+from src.exception.exception import FailException
+
+
+class TestMailService:
+    def test_verify_mail_code_rejects_replay(self, db, monkeypatch) -> None:
+        """通过Redis使用过的验证码，在数据库记录标记为已使用前也不能再次校验通过"""
+        from app.http.module import injector
+        from src.service import mail_service as mail_service_module
+        from src.service.mail_service import MailService
+
+        # 不投递标记任务，模拟数据库记录仍处于未使用状态
+        monkeypatch.setattr(mail_service_module, "mark_mail_code_used", Mock())
+        mail_service = injector.get(MailService)
+        email, verify_code = "replay@example.com", "123456"
+        redis_keys = [
+            f"mail_code:{email}",
+            f"mail_limit:{email}",
+            f"mail_code_consumed:{email}:{verify_code}",
+        ]
+
+        mail_service.redis_client.setex(redis_keys[0], 300, verify_code)
+        mail_service.create_verification_code(
+            email,
+            verify_code,
+            datetime.now(UTC) + timedelta(minutes=5),
+        )
+        try:
+            assert mail_service.verify_mail_code(email, verify_code) is True
+            with pytest.raises(FailException):
+                mail_service.verify_mail_code(email, verify_code)
+        finally:
+            mail_service.redis_client.delete(*redis_keys)
@@ -0,0 +1,48 @@
+from uuid import uuid4
+
+from langchain_core.documents import Document as LCDocument
+
+
+class TestRetrievalService:
+    def test_batch_search_in_datasets(self, app, monkeypatch) -> None:
+        """批量检索结果与查询顺序一一对应，且所有查询只记录一次历史"""
+        from app.http.module import injector
+        from src.service.retrieval_service import RetrievalService
+
+        retrieval_service = injector.get(RetrievalService)
+        dataset_ids, account_id = [uuid4()], uuid4()
+        queries = ["python", "flask", "redis"]
+        recorded = []
+
+        monkeypatch.setattr(
+            retrieval_service,
+            "_get_valid_dataset_ids",
+            lambda ids, _account_id: ids,
+        )
+        monkeypatch.setattr(retrieval_service, "_get_cache_generation", lambda: None)
+        monkeypatch.setattr(
+            retrieval_service,
+            "_retrieve",
+            lambda _ids, query, *_args: [LCDocument(page_content=query)],
+        )
+        monkeypatch.setattr(
+            retrieval_service,
+            "_record_queries",
+            lambda query_documents, *_args: recorded.append(query_documents),
+        )
+
+        with app.app_context():
+            documents_list = retrieval_service.batch_search_in_datasets(
+                dataset_ids,
+                account_id,
+                queries,
+            )
+
+        assert [documents[0].page_content for documents in documents_list] == queries
+        assert len(recorded) == 1
+        assert [query for query, _ in recorded[0]] == queries
+        assert retrieval_service.batch_search_in_datasets(
+            dataset_ids,
+            account_id,
+            [],
+        ) == []